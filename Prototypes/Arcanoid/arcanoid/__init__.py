@@ -0,0 +1 @@
+"""Cosmic Breaker: логика игры импортируется без окна, отрисовка — в arcanoid.display"""
@@ -0,0 +1,56 @@
+"""Мячи Arcanoid: пул заранее созданных объектов со __slots__"""
+MAX_BALLS = 1024
+
+
+class Ball:
+    __slots__ = ('x', 'y', 'dx', 'dy', 'prev_x', 'prev_y')
+
+    def __init__(self):
+        self.x = self.y = 0.0
+        self.dx = self.dy = 0.0
+        self.prev_x = self.prev_y = 0.0
+
+    def remember(self):
+        # Положение на начало тика — от него интерполируется отрисовка
+        self.prev_x = self.x
+        self.prev_y = self.y
+
+
+class BallPool:
+    # Все мячи создаются сразу; в игре они только переходят между free и active,
+    # так что мультибол не создаёт объектов на каждом кадре
+    def __init__(self, capacity=MAX_BALLS):
+        self.free = [Ball() for _ in range(capacity)]
+        self.active = []
+
+    def __len__(self):
+        return len(self.active)
+
+    def __iter__(self):
+        return iter(self.active)
+
+    def __getitem__(self, index):
+        return self.active[index]
+
+    def spawn(self, x, y, dx, dy):
+        # None, если пул исчерпан: лишние мячи просто не появляются
+        if not self.free:
+            return None
+        ball = self.free.pop()
+        ball.x, ball.y, ball.dx, ball.dy = x, y, dx, dy
+        ball.remember()  # новый мяч не интерполируется из старого положения
+        self.active.append(ball)
+        return ball
+
+    def release(self, index):
+        # На место выбывшего ставится последний мяч — порядок не сохраняется,
+        # поэтому при удалении в цикле обходить active нужно с конца
+        ball = self.active[index]
+        last = self.active.pop()
+        if last is not ball:
+            self.active[index] = last
+        self.free.append(ball)
+
+    def clear(self):
+        self.free.extend(self.active)
+        self.active.clear()
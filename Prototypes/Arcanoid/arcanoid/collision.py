@@ -0,0 +1,135 @@
+"""Непрерывные столкновения мяча: круг, летящий за тик по отрезку, против стен и прямоугольников"""
+import math
+
+import pygame
+
+# Допуск на погрешность float: мяч, прижатый к блоку, не считается вошедшим в него,
+# а касания с почти равным временем считаются одновременными
+EPS = 1e-6
+
+
+def slab(pos, vel, low, high):
+    # Доли пути, на которых координата внутри [low, high], и знак нормали входа
+    if vel == 0:
+        if low <= pos <= high:
+            return -math.inf, math.inf, 0
+        return math.inf, -math.inf, 0
+    t0 = (low - pos) / vel
+    t1 = (high - pos) / vel
+    if vel > 0:
+        return t0, t1, -1
+    return t1, t0, 1
+
+
+def sweep_circle_rect(x, y, dx, dy, radius, rect):
+    # Когда круг, сдвигаясь на (dx, dy), впервые коснётся прямоугольника.
+    # Возвращает (t, нормаль), t — доля пути от 0 до 1, или None, если касания нет.
+    # Круг против прямоугольника — это точка против прямоугольника, раздутого
+    # на радиус со скруглёнными углами: луч против граней, а в углах — против окружностей
+    left, top, right, bottom = rect.left, rect.top, rect.right, rect.bottom
+
+    # Уже касаются или пересекаются (ракетка наехала на мяч): столкновение сразу,
+    # если мяч движется внутрь, нормаль — по кратчайшему пути наружу
+    near_x = min(max(x, left), right)
+    near_y = min(max(y, top), bottom)
+    gap_x, gap_y = x - near_x, y - near_y
+    if gap_x * gap_x + gap_y * gap_y <= radius * radius + EPS:
+        if gap_x or gap_y:
+            length = math.hypot(gap_x, gap_y)
+            normal = (gap_x / length, gap_y / length)
+        else:
+            # Центр внутри прямоугольника — наружу через ближайшую грань
+            normal = min((x - left, (-1, 0)), (right - x, (1, 0)),
+                         (y - top, (0, -1)), (bottom - y, (0, 1)))[1]
+        if dx * normal[0] + dy * normal[1] < 0:
+            return 0.0, normal
+        return None
+
+    x0, x1, sign_x = slab(x, dx, left - radius, right + radius)
+    y0, y1, sign_y = slab(y, dy, top - radius, bottom + radius)
+    t_enter, t_exit = max(x0, y0), min(x1, y1)
+    if t_enter > t_exit or t_enter > 1 or t_exit < 0:
+        return None
+
+    # Мяч снаружи, поэтому t_enter < 0 бывает, только когда он в углу раздутого прямоугольника
+    t = max(t_enter, 0.0)
+    hit_x, hit_y = x + dx * t, y + dy * t
+    if left <= hit_x <= right or top <= hit_y <= bottom:
+        return t, ((sign_x, 0) if x0 > y0 else (0, sign_y))
+
+    # Точка входа в углу раздутого прямоугольника — проверяем окружность угла
+    corner_x = left if hit_x < left else right
+    corner_y = top if hit_y < top else bottom
+    ox, oy = x - corner_x, y - corner_y
+    a = dx * dx + dy * dy
+    b = ox * dx + oy * dy
+    c = ox * ox + oy * oy - radius * radius
+    disc = b * b - a * c
+    if disc < 0 or b >= 0:
+        return None
+    t = (-b - math.sqrt(disc)) / a
+    if t < -EPS or t > 1:
+        return None
+    t = max(t, 0.0)
+    return t, ((ox + dx * t) / radius, (oy + dy * t) / radius)
+
+
+def sweep_walls(x, y, dx, dy, radius, bounds):
+    # Касание левой, правой или верхней стены поля; снизу поле открыто
+    best = None
+    for pos, vel, wall, normal in ((x, dx, bounds.left + radius, (1, 0)),
+                                   (x, dx, bounds.right - radius, (-1, 0)),
+                                   (y, dy, bounds.top + radius, (0, 1))):
+        # Скорость направлена к стене, если её проекция на нормаль отрицательна
+        if vel * (normal[0] + normal[1]) >= 0:
+            continue
+        t = max((wall - pos) / vel, 0.0)
+        if t <= 1 and (best is None or t < best[0]):
+            best = (t, normal)
+    return best
+
+
+def swept_rect(x, y, dx, dy, radius):
+    # Прямоугольник, который мяч заметает за шаг, — для отбора кандидатов
+    left = math.floor(min(x, x + dx) - radius) - 1
+    top = math.floor(min(y, y + dy) - radius) - 1
+    return pygame.Rect(left, top,
+                       math.ceil(max(x, x + dx) + radius) + 1 - left,
+                       math.ceil(max(y, y + dy) + radius) + 1 - top)
+
+
+def first_contact(x, y, dx, dy, radius, bounds, rects):
+    # Самое раннее касание на пути: (t, нормаль, индексы задетых rects).
+    # Одновременные касания (мяч попал в стык двух блоков или в угол у стены)
+    # возвращаются вместе, а их нормали складываются. None — путь свободен
+    hit = sweep_walls(x, y, dx, dy, radius, bounds)
+    best_t = hit[0] if hit else math.inf
+    normals = [hit[1]] if hit else []
+    indices = []
+    for index, rect in enumerate(rects):
+        hit = sweep_circle_rect(x, y, dx, dy, radius, rect)
+        if hit is None or hit[0] > best_t + EPS:
+            continue
+        if hit[0] < best_t - EPS:
+            best_t, normals, indices = hit[0], [], []
+        normals.append(hit[1])
+        indices.append(index)
+    if not normals:
+        return None
+
+    nx = sum(normal[0] for normal in normals)
+    ny = sum(normal[1] for normal in normals)
+    length = math.hypot(nx, ny)
+    if length < EPS:
+        # Нормали погасили друг друга (мяч зажат между ракеткой и блоком) — разворот
+        length = math.hypot(dx, dy)
+        nx, ny = -dx, -dy
+    return best_t, (nx / length, ny / length), indices
+
+
+def reflect(dx, dy, normal):
+    # Отражение скорости от поверхности с единичной нормалью
+    dot = dx * normal[0] + dy * normal[1]
+    if dot >= 0:
+        return dx, dy
+    return dx - 2 * dot * normal[0], dy - 2 * dot * normal[1]
@@ -0,0 +1,274 @@
+"""Окно Cosmic Breaker: ввод с клавиатуры, отрисовка грязными прямоугольниками и игровой цикл"""
+import random
+import time
+
+import pygame
+
+from .game import HEIGHT, LEFT, RESTART, RIGHT, TICK_TIME, WIDTH, Game
+from .particles import Particles
+from .profiler import NullProfiler
+from .replay import Recorder
+from .text import TextRenderer
+
+# Цвета
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+BLUE = (0, 0, 255)
+RED = (255, 0, 0)
+GREEN = (0, 255, 0)
+YELLOW = (255, 255, 0)
+ORANGE = (255, 165, 0)
+PURPLE = (128, 0, 128)
+
+BRICK_COLORS = [RED, GREEN, BLUE, YELLOW, ORANGE, PURPLE]
+BRICK_WIDTH = 80
+BRICK_HEIGHT = 30
+
+MAX_FRAME_TIME = 0.25  # после долгого зависания не пытаемся догнать всё разом
+
+
+def open_window():
+    # SDL инициализируется только здесь: логику игры можно импортировать и считать без окна
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Cosmic Breaker")
+    return screen
+
+
+def draw_brick(surface, brick):
+    # Повреждённый блок темнее — пропорционально потерянной прочности
+    color = brick.kind.color
+    if brick.hp < brick.kind.hp:
+        color = tuple(c * (brick.hp + 1) // (brick.kind.hp + 1) for c in color)
+    pygame.draw.rect(surface, color, brick.rect)
+    pygame.draw.rect(surface, WHITE, brick.rect, 2)
+
+
+class Display:
+    def __init__(self, game, screen):
+        self.game = game
+        self.screen = screen
+        self.restart_requested = False
+        # Шрифты и надписи кэшируются, а не создаются каждый кадр
+        self.text = TextRenderer()
+        # Блоки нарисованы один раз на слое поля; на экране каждый кадр
+        # перерисовываются только области под мячом, ракеткой и текстом
+        self.layer = pygame.Surface((WIDTH, HEIGHT))
+        self.drawn = []  # где в прошлом кадре рисовались подвижные объекты и текст
+        self.dirty = []  # области экрана, изменённые в этом кадре
+        self.patched = []  # разбитые блоки, которые надо стереть с экрана
+        self.full_redraw = True
+        # Осколки — только картинка, в логике игры их нет
+        self.particles = Particles()
+        game.listeners.append(self.on_brick)
+        self.render_layer()
+
+    def on_brick(self, brick):
+        if brick is None:
+            self.particles.clear()
+            self.render_layer()
+        elif brick.hp:
+            draw_brick(self.layer, brick)
+            self.patched.append(brick.rect)
+        else:
+            # Блок стирается со слоя, а на экране — при следующей отрисовке
+            self.layer.fill(BLACK, brick.rect)
+            self.patched.append(brick.rect)
+            self.particles.burst(brick.rect, brick.kind.color)
+
+    def render_layer(self):
+        self.layer.fill(BLACK)
+        for brick in self.game.bricks:
+            draw_brick(self.layer, brick)
+        self.full_redraw = True
+
+    def handle_events(self):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return False
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_r:
+                    # Выполнится в ближайшем тике, чтобы попасть в запись ввода
+                    self.restart_requested = True
+                if event.key == pygame.K_ESCAPE:
+                    return False
+        return True
+
+    def read_controls(self):
+        keys = pygame.key.get_pressed()
+        controls = 0
+        if keys[pygame.K_LEFT]:
+            controls |= LEFT
+        if keys[pygame.K_RIGHT]:
+            controls |= RIGHT
+        if self.restart_requested:
+            controls |= RESTART
+        return controls
+
+    def tick(self, controls):
+        self.game.remember_positions()
+        self.game.update(controls)
+        self.particles.update()
+
+    def draw(self, alpha=1.0):
+        # alpha — доля пройденного следующего тика: рисуем между двумя состояниями физики
+        game, screen = self.game, self.screen
+        paddle_x = game.prev_paddle_x + (game.paddle_x - game.prev_paddle_x) * alpha
+
+        # Фон и блоки — копия слоя: целиком после его перестройки,
+        # иначе только там, где в прошлом кадре что-то двигалось или исчезло
+        if self.full_redraw:
+            screen.blit(self.layer, (0, 0))
+            self.dirty = [screen.get_rect()]
+            self.full_redraw = False
+        else:
+            self.dirty = self.drawn + self.patched
+            for rect in self.dirty:
+                screen.blit(self.layer, rect, rect)
+        self.drawn = []
+        self.patched = []
+
+        # Осколки под остальными объектами
+        self.mark(self.particles.draw(screen))
+
+        # Отрисовка ракетки
+        self.mark(pygame.draw.rect(screen, BLUE, (paddle_x, game.paddle_y, game.paddle_width, game.paddle_height)))
+
+        # Отрисовка мячей
+        for ball in game.balls:
+            ball_x = ball.prev_x + (ball.x - ball.prev_x) * alpha
+            ball_y = ball.prev_y + (ball.y - ball.prev_y) * alpha
+            self.mark(pygame.draw.circle(screen, RED, (int(ball_x), int(ball_y)), game.ball_radius))
+
+    def mark(self, rect):
+        # Область нарисована поверх слоя: показать сейчас и стереть в следующем кадре
+        if rect is not None:
+            self.drawn.append(rect)
+            self.dirty.append(rect)
+
+    def present(self):
+        # Вместо flip() на экран уходят только изменённые области
+        pygame.display.update(self.dirty)
+
+    def draw_ui(self):
+        game, screen = self.game, self.screen
+        # Отрисовка счета и жизней
+        score_text = self.text.render(f"Счет: {game.score}", 36, WHITE)
+        lives_text = self.text.render(f"Жизни: {game.lives}", 36, WHITE)
+        self.mark(screen.blit(score_text, (10, 10)))
+        self.mark(screen.blit(lives_text, (WIDTH - 120, 10)))
+        level_text = self.text.render(f"Уровень {game.level_number % len(game.levels) + 1}: {game.level.name}", 36, WHITE)
+        self.mark(screen.blit(level_text, (WIDTH//2 - level_text.get_width()//2, 10)))
+
+        # Сообщения
+        if game.game_over:
+            game_over_text = self.text.render("ИГРА ОКОНЧЕНА", 72, RED)
+            restart_text = self.text.render("Нажмите R для рестарта", 72, WHITE)
+            self.mark(screen.blit(game_over_text, (WIDTH//2 - game_over_text.get_width()//2, HEIGHT//2 - 50)))
+            self.mark(screen.blit(restart_text, (WIDTH//2 - restart_text.get_width()//2, HEIGHT//2 + 20)))
+
+        elif game.level_complete:
+            win_text = self.text.render("УРОВЕНЬ ПРОЙДЕН!", 72, GREEN)
+            restart_text = self.text.render("Нажмите R для нового уровня", 72, WHITE)
+            self.mark(screen.blit(win_text, (WIDTH//2 - win_text.get_width()//2, HEIGHT//2 - 50)))
+            self.mark(screen.blit(restart_text, (WIDTH//2 - restart_text.get_width()//2, HEIGHT//2 + 20)))
+
+    def run(self, profiler=None, max_fps=60, record_path=None, replay=None, speed=1.0):
+        # profiler — замер фаз кадра (см. profiler.py), по умолчанию выключен.
+        # max_fps ограничивает только отрисовку (0 — без ограничения),
+        # физика всегда идёт с частотой TICK_RATE * speed.
+        # record_path — куда сохранить запись партии при выходе;
+        # replay — показать записанную партию вместо игры с клавиатуры
+        profiler = profiler or NullProfiler()
+        recorder = Recorder(self.game.seed) if record_path else None
+        inputs = replay.controls() if replay else None
+        clock = pygame.time.Clock()
+        running = True
+        accumulator = 0.0
+        previous = time.perf_counter()
+
+        while running:
+            profiler.begin_frame()
+            now = time.perf_counter()
+            accumulator += min(now - previous, MAX_FRAME_TIME) * speed
+            previous = now
+
+            with profiler.phase('ввод'):
+                running = self.handle_events()
+                controls = self.read_controls()
+            with profiler.phase('обновление'):
+                while running and accumulator >= TICK_TIME:
+                    if inputs is not None:
+                        controls = next(inputs, None)
+                        if controls is None:
+                            print("Запись закончилась")
+                            running = False
+                            break
+                    self.tick(controls)
+                    if recorder:
+                        recorder.record(controls, self.game)
+                    # R срабатывает в одном тике, даже если их несколько за кадр
+                    controls &= ~RESTART
+                    self.restart_requested = False
+                    accumulator -= TICK_TIME
+            with profiler.phase('отрисовка'):
+                self.draw(accumulator / TICK_TIME)
+            with profiler.phase('интерфейс'):
+                self.draw_ui()
+                self.mark(profiler.draw(self.screen))
+            with profiler.phase('flip'):
+                self.present()
+            profiler.end_frame()
+            clock.tick(max_fps)
+
+        profiler.dump_trace()
+        if recorder:
+            recorder.save(record_path)
+        self.game.levels.shutdown()
+        pygame.quit()
+
+
+def run_stress(ticks, ball_counts, particle_count):
+    # Нагрузочный тест мультибола и осколков: на каждое число мячей — среднее время
+    # тика физики и кадра. Упавшие мячи и погасшие осколки всё время восполняются
+    game = Game()
+    display = Display(game, open_window())
+    display.particles = Particles(max(particle_count, display.particles.capacity))
+    rng = random.Random(0)
+    print(f"{'мячей':>6} {'осколков':>9} {'тик, мс':>8} {'кадр, мс':>9} {'FPS':>6}")
+    for count in ball_counts:
+        game.reset_game()
+        update_time = draw_time = 0.0
+        debris = 0
+        for tick in range(ticks):
+            if game.game_over or game.level_complete:
+                game.reset_game()
+            # Мячи набираются так же, как в игре: подачей и мультиболом
+            if not game.balls:
+                game.serve_ball()
+            while len(game.balls) < count and game.balls.free:
+                game.split_balls(count)
+            missing = particle_count - len(display.particles)
+            if missing > 0:
+                area = pygame.Rect(rng.randrange(WIDTH - BRICK_WIDTH), rng.randrange(HEIGHT // 2),
+                                   BRICK_WIDTH, BRICK_HEIGHT)
+                display.particles.burst(area, rng.choice(BRICK_COLORS), missing)
+
+            start = time.perf_counter()
+            display.tick(0)
+            middle = time.perf_counter()
+            display.draw()
+            display.draw_ui()
+            display.present()
+            pygame.event.pump()
+            end = time.perf_counter()
+            update_time += middle - start
+            draw_time += end - middle
+            debris += len(display.particles)
+
+        tick_ms = update_time / ticks * 1000
+        frame_ms = draw_time / ticks * 1000
+        print(f"{count:>6} {debris // ticks:>9} {tick_ms:>8.2f} {frame_ms:>9.2f} "
+              f"{1000 / (tick_ms + frame_ms):>6.0f}")
+    game.levels.shutdown()
+    pygame.quit()
@@ -0,0 +1,215 @@
+"""Логика Cosmic Breaker: ракетка, мячи, блоки и тик физики — без окна и отрисовки"""
+import math
+import random
+
+import pygame
+
+from .ball import BallPool
+from .collision import first_contact, reflect, swept_rect
+from .grid import BrickGrid
+from .levels import LevelLoader
+from .replay import state_checksum
+
+# Размер поля
+WIDTH, HEIGHT = 800, 600
+FIELD = pygame.Rect(0, 0, WIDTH, HEIGHT)  # стены слева, справа и сверху
+
+# Физика идёт фиксированными шагами независимо от частоты кадров
+TICK_RATE = 60
+TICK_TIME = 1 / TICK_RATE
+MAX_BOUNCES = 8  # отскоков мяча за тик; остаток пути после них отбрасывается
+MULTIBALL_ANGLE = 0.35  # на сколько радиан расходятся мячи при разделении
+# Наименьшая вертикальная скорость после отскока в долях ball_speed: отскок от угла
+# может положить мяч почти горизонтально, и он надолго застрянет между стенами
+MIN_VERTICAL = 0.5
+
+# Параметры баланса (подбираются пакетной симуляцией, см. simulate.run_batch)
+PADDLE_WIDTH = 100
+PADDLE_SPEED = 8
+BALL_SPEED = 5
+BOUNCE_SPREAD = 8  # горизонтальная скорость мяча после удара о край ракетки
+
+# Управление за тик — битовая маска; так оно записывается в повторы
+LEFT = 1
+RIGHT = 2
+RESTART = 4  # R после проигрыша или пройденного уровня
+
+
+class Brick:
+    def __init__(self, x, y, width, height, kind, hp):
+        self.rect = pygame.Rect(x, y, width, height)
+        self.kind = kind  # BrickType из файла уровня
+        self.hp = hp  # 0 — неразрушимый
+
+
+class Game:
+    def __init__(self, seed=None, paddle_width=PADDLE_WIDTH,
+                 ball_speed=BALL_SPEED, bounce_spread=BOUNCE_SPREAD):
+        # Все случайности партии берутся из своего генератора: с тем же сидом
+        # и тем же вводом партия повторяется тик в тик (см. replay.py)
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.paddle_width = paddle_width
+        self.ball_speed = ball_speed
+        self.bounce_spread = bounce_spread
+        # Подписчики на изменения блоков: listener(brick) после удара по блоку,
+        # listener(None) — поле построено заново. Так отрисовка узнаёт, что перерисовать
+        self.listeners = []
+        # Мячи живут в заранее выделенном пуле
+        self.balls = BallPool()
+        # Уровни грузятся в фоне: следующий готов раньше, чем пройден текущий
+        self.levels = LevelLoader()
+        self.reset_game()
+
+    def notify(self, brick):
+        for listener in self.listeners:
+            listener(brick)
+
+    def reset_game(self):
+        # Игровые параметры
+        self.score = 0
+        self.lives = 3
+        self.game_over = False
+        self.start_level(0)
+
+    def start_level(self, number):
+        # Ракетка
+        self.paddle_height = 20
+        self.paddle_x = WIDTH // 2 - self.paddle_width // 2
+        self.paddle_y = HEIGHT - 40
+        self.paddle_speed = PADDLE_SPEED
+
+        # Мяч
+        self.ball_radius = 10
+        self.balls.clear()
+        self.serve_ball()
+        self.remember_positions()
+
+        self.level_complete = False
+        self.level_number = number
+        self.level = self.levels.get(number)
+
+        # Создание блоков
+        self.create_bricks()
+
+    def create_bricks(self):
+        # Разбитые блоки удаляются из сетки; bricks_left — сколько осталось разрушимых
+        self.bricks = BrickGrid()
+        self.bricks_left = 0
+        for x, y, width, height, kind, hp in self.level.bricks:
+            self.bricks.add(Brick(x, y, width, height, self.level.types[kind], hp))
+            if hp:
+                self.bricks_left += 1
+        self.notify(None)
+
+    def hit_brick(self, brick):
+        if not brick.hp:
+            return  # неразрушимый
+        brick.hp -= 1
+        if not brick.hp:
+            self.bricks.remove(brick)
+            self.bricks_left -= 1
+            self.score += brick.kind.score
+        self.notify(brick)
+
+    def serve_ball(self):
+        self.balls.spawn(WIDTH // 2, HEIGHT // 2,
+                         self.ball_speed * self.rng.choice([-1, 1]), -self.ball_speed)
+
+    def split_balls(self, limit=None):
+        # Мультибол: от каждого мяча отделяются два, под углом к нему,
+        # пока мячей не станет limit (или пока не кончится пул)
+        for index in range(len(self.balls)):
+            ball = self.balls[index]
+            for angle in (-MULTIBALL_ANGLE, MULTIBALL_ANGLE):
+                if limit is not None and len(self.balls) >= limit:
+                    return
+                cos, sin = math.cos(angle), math.sin(angle)
+                self.balls.spawn(ball.x, ball.y,
+                                 ball.dx * cos - ball.dy * sin, ball.dx * sin + ball.dy * cos)
+
+    def checksum(self):
+        # Отпечаток состояния физики: по нему повтор находит тик рассинхрона
+        state = [self.paddle_x, self.score, self.lives, self.level_number, self.bricks_left]
+        for ball in self.balls:
+            state += (ball.x, ball.y, ball.dx, ball.dy)
+        return state_checksum(state)
+
+    def remember_positions(self):
+        # Положения на начало тика — от них интерполируется отрисовка
+        self.prev_paddle_x = self.paddle_x
+        for ball in self.balls:
+            ball.remember()
+
+    def update(self, controls=0):
+        # controls — маска LEFT/RIGHT/RESTART; клавиатура читается не здесь,
+        # поэтому тик зависит только от состояния и ввода
+        if controls & RESTART:
+            if self.game_over:
+                self.reset_game()
+            elif self.level_complete:
+                self.start_level(self.level_number + 1)
+        if self.game_over or self.level_complete:
+            return
+
+        # Управление ракеткой
+        if controls & LEFT and self.paddle_x > 0:
+            self.paddle_x -= self.paddle_speed
+        if controls & RIGHT and self.paddle_x < WIDTH - self.paddle_width:
+            self.paddle_x += self.paddle_speed
+
+        paddle = pygame.Rect(self.paddle_x, self.paddle_y, self.paddle_width, self.paddle_height)
+        for ball in self.balls:
+            self.move_ball(ball, paddle)
+
+        # Упавшие мячи возвращаются в пул; жизнь теряется, когда упали все
+        for index in range(len(self.balls) - 1, -1, -1):
+            if self.balls[index].y >= HEIGHT:
+                self.balls.release(index)
+        if not self.balls:
+            self.lives -= 1
+            if self.lives <= 0:
+                self.game_over = True
+            else:
+                self.serve_ball()
+
+        # Проверка завершения уровня
+        if not self.bricks_left:
+            self.level_complete = True
+
+    def move_ball(self, ball, paddle):
+        # Мяч проходит путь тика по частям: до ближайшего касания, отскок, остаток пути.
+        # Так он не проскакивает сквозь блоки и ракетку на любой скорости
+        # и может за один тик отскочить несколько раз и разбить несколько блоков
+        remaining = 1.0
+        for _ in range(MAX_BOUNCES):
+            dx, dy = ball.dx * remaining, ball.dy * remaining
+            path = swept_rect(ball.x, ball.y, dx, dy, self.ball_radius)
+            bricks = self.bricks.query(path)
+            contact = first_contact(ball.x, ball.y, dx, dy, self.ball_radius,
+                                    FIELD, [paddle] + [brick.rect for brick in bricks])
+            if contact is None:
+                ball.x += dx
+                ball.y += dy
+                return
+
+            t, normal, hits = contact
+            ball.x += dx * t
+            ball.y += dy * t
+            remaining *= 1 - t
+            ball.dx, ball.dy = reflect(ball.dx, ball.dy, normal)
+            min_dy = MIN_VERTICAL * self.ball_speed
+            if abs(ball.dy) < min_dy:
+                # Прочь от поверхности, если она не отвесная: так мяч не уходит в неё
+                ball.dy = math.copysign(min_dy, normal[1] or ball.dy or 1)
+            for index in hits:
+                if index:
+                    self.hit_brick(bricks[index - 1])
+
+            # С верха ракетки угол отскока зависит от точки удара
+            if 0 in hits and normal[1] < 0:
+                hit_pos = min(max((ball.x - paddle.x) / paddle.width, 0), 1)
+                ball.dx = self.bounce_spread * (hit_pos - 0.5)
+                # Вертикальная скорость после ракетки всегда ball_speed, как бы мяч ни
+                # летел до удара: иначе пологий отскок от угла блока так и остаётся пологим
+                ball.dy = -self.ball_speed
@@ -0,0 +1,54 @@
+"""Пространственный индекс блоков: равномерная сетка корзин"""
+CELL_SIZE = 64  # сторона ячейки в пикселях, порядка размера блока
+
+
+class BrickGrid:
+    # Каждый блок лежит во всех ячейках, которые задевает его rect.
+    # Запрос смотрит только ячейки под областью, а не все блоки уровня
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}  # (столбец, строка) -> список блоков
+        self.bricks = {}  # блок -> его ячейки; порядок добавления — порядок отрисовки
+
+    def __len__(self):
+        # Сколько блоков осталось — без обхода уровня
+        return len(self.bricks)
+
+    def __iter__(self):
+        return iter(self.bricks)
+
+    def __contains__(self, brick):
+        return brick in self.bricks
+
+    def cells_under(self, rect):
+        size = self.cell_size
+        # right/bottom не входят в rect, поэтому последняя ячейка — по right - 1
+        for row in range(rect.top // size, (rect.bottom - 1) // size + 1):
+            for col in range(rect.left // size, (rect.right - 1) // size + 1):
+                yield col, row
+
+    def add(self, brick):
+        cells = list(self.cells_under(brick.rect))
+        for cell in cells:
+            self.cells.setdefault(cell, []).append(brick)
+        self.bricks[brick] = cells
+
+    def remove(self, brick):
+        for cell in self.bricks.pop(brick):
+            bucket = self.cells[cell]
+            bucket.remove(brick)
+            if not bucket:
+                del self.cells[cell]
+
+    def clear(self):
+        self.cells.clear()
+        self.bricks.clear()
+
+    def query(self, rect):
+        # Блоки, пересекающиеся с rect, каждый один раз и в стабильном порядке
+        found = {}
+        for cell in self.cells_under(rect):
+            for brick in self.cells.get(cell, ()):
+                if brick not in found and rect.colliderect(brick.rect):
+                    found[brick] = None
+        return list(found)
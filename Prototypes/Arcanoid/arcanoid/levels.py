@@ -0,0 +1,150 @@
+"""Уровни Arcanoid: описание в JSON, двоичный кэш разобранных уровней и фоновая подгрузка"""
+import json
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+# Файлы уровней лежат рядом с пакетом, в папке игры
+LEVEL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'levels')
+CACHE_DIR = os.path.join(LEVEL_DIR, 'cache')
+
+EMPTY_CELL = '.'
+DEFAULT_BRICK = (80, 30)
+DEFAULT_GAP = 5
+DEFAULT_TOP = 50
+FIELD_WIDTH = 800
+
+# Кэш: magic, версия, mtime и размер исходного файла, длина JSON с типами блоков,
+# число блоков; за ним JSON и записи блоков (x, y, ширина, высота, тип, прочность)
+CACHE_MAGIC = b'CBLV'
+CACHE_VERSION = 1
+CACHE_HEADER = struct.Struct('<4sHqqII')
+CACHE_BRICK = struct.Struct('<hhhhBB')
+
+
+class BrickType:
+    def __init__(self, name, color, hp=1, score=10, drops=None):
+        self.name = name
+        self.color = tuple(color)
+        self.hp = hp  # 0 — неразрушимый
+        self.score = score
+        self.drops = drops  # имя таблицы выпадения бонусов или None
+
+
+class Level:
+    def __init__(self, meta, bricks):
+        # meta — имя, типы блоков и таблицы бонусов; bricks — кортежи
+        # (x, y, ширина, высота, индекс типа, прочность)
+        self.name = meta['name']
+        self.types = [BrickType(**kind) for kind in meta['types']]
+        # Таблицы выпадения бонусов пока только данные: бонусов в игре ещё нет
+        self.drops = meta['drops']
+        self.bricks = bricks
+
+
+def parse_level(data):
+    # JSON-описание -> (meta, bricks). Раскладка — строки символов, каждый символ —
+    # тип блока из "types" или "." для пустой клетки
+    brick_w, brick_h = data.get('brick', DEFAULT_BRICK)
+    gap = data.get('gap', DEFAULT_GAP)
+    layout = data['layout']
+    columns = max(len(row) for row in layout)
+    left, top = data.get('origin', ((FIELD_WIDTH - columns * (brick_w + gap)) // 2, DEFAULT_TOP))
+
+    symbols = list(data['types'])
+    types = []
+    for symbol in symbols:
+        kind = dict(data['types'][symbol])
+        kind.setdefault('name', symbol)
+        types.append(kind)
+    meta = {'name': data.get('name', ''), 'types': types, 'drops': data.get('drops', {})}
+
+    bricks = []
+    for row, line in enumerate(layout):
+        for col, symbol in enumerate(line):
+            if symbol == EMPTY_CELL:
+                continue
+            if symbol not in data['types']:
+                raise ValueError(f"неизвестный тип блока {symbol!r} в строке {row + 1}")
+            index = symbols.index(symbol)
+            bricks.append((left + col * (brick_w + gap), top + row * (brick_h + gap),
+                           brick_w, brick_h, index, types[index].get('hp', 1)))
+    return meta, bricks
+
+
+def pack_level(stat, meta, bricks):
+    blob = json.dumps(meta, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    parts = [CACHE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, stat.st_mtime_ns, stat.st_size,
+                               len(blob), len(bricks)), blob]
+    parts.extend(CACHE_BRICK.pack(*brick) for brick in bricks)
+    return b''.join(parts)
+
+
+def unpack_level(data, stat):
+    # None, если кэш от другой версии файла уровня
+    magic, version, mtime, size, meta_size, count = CACHE_HEADER.unpack_from(data)
+    if (magic != CACHE_MAGIC or version != CACHE_VERSION
+            or mtime != stat.st_mtime_ns or size != stat.st_size):
+        return None
+    start = CACHE_HEADER.size
+    meta = json.loads(data[start:start + meta_size].decode('utf-8'))
+    start += meta_size
+    bricks = list(CACHE_BRICK.iter_unpack(data[start:start + count * CACHE_BRICK.size]))
+    return meta, bricks
+
+
+def load_level(path, cache_dir=CACHE_DIR):
+    # Разобранный уровень берётся из кэша; если кэша нет или файл менялся —
+    # разбирается заново и кэш перезаписывается
+    stat = os.stat(path)
+    cache_path = os.path.join(cache_dir, os.path.splitext(os.path.basename(path))[0] + '.lvc')
+    if os.path.exists(cache_path):
+        with open(cache_path, 'rb') as f:
+            parsed = unpack_level(f.read(), stat)
+        if parsed is not None:
+            return Level(*parsed)
+
+    with open(path, encoding='utf-8') as f:
+        meta, bricks = parse_level(json.load(f))
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(cache_path + '.tmp', 'wb') as f:
+            f.write(pack_level(stat, meta, bricks))
+        os.replace(cache_path + '.tmp', cache_path)
+    except OSError as e:
+        print(f"Не удалось записать кэш уровня: {e}")
+    return Level(meta, bricks)
+
+
+class LevelLoader:
+    # Уровни читаются в фоновом потоке: пока идёт текущий, следующий уже загружается
+    def __init__(self, directory=LEVEL_DIR):
+        self.paths = sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                            if name.endswith('.json'))
+        if not self.paths:
+            raise FileNotFoundError(f"{directory}: нет файлов уровней")
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.futures = {}  # номер уровня -> Future с Level
+
+    def __len__(self):
+        return len(self.paths)
+
+    def prefetch(self, index):
+        index %= len(self.paths)
+        if index not in self.futures:
+            self.futures[index] = self.executor.submit(load_level, self.paths[index])
+
+    def get(self, index):
+        # Ждёт, только если уровень ещё не успел загрузиться; после этого
+        # в фоне начинает грузиться следующий
+        index %= len(self.paths)
+        self.prefetch(index)
+        level = self.futures[index].result()
+        following = (index + 1) % len(self.paths)
+        for stale in [key for key in self.futures if key not in (index, following)]:
+            del self.futures[stale]
+        self.prefetch(following)
+        return level
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
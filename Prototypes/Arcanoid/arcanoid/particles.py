@@ -0,0 +1,75 @@
+"""Частицы Arcanoid (осколки блоков): кольцевой пул в массивах numpy"""
+import numpy as np
+import pygame
+
+MAX_PARTICLES = 4096
+DEBRIS_COUNT = 12  # осколков от одного блока
+DEBRIS_SPEED = 3.0
+GRAVITY = 0.2
+LIFETIME = 45  # тиков
+SIZE = 2  # сторона частицы в пикселях
+
+
+class Particles:
+    # Struct of arrays фиксированной ёмкости. Новые частицы пишутся по кругу
+    # поверх самых старых, поэтому ни создания, ни поиска свободных мест нет
+    def __init__(self, capacity=MAX_PARTICLES, seed=None):
+        self.capacity = capacity
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.life = np.zeros(capacity, dtype=np.int32)  # тиков до исчезновения, 0 — мёртвая
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+        self.cursor = 0
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.life))
+
+    def clear(self):
+        self.life[:] = 0
+
+    def burst(self, rect, color, count=DEBRIS_COUNT):
+        # Осколки разлетаются из случайных точек rect
+        count = min(count, self.capacity)
+        slots = (self.cursor + np.arange(count)) % self.capacity
+        self.cursor = (self.cursor + count) % self.capacity
+        self.x[slots] = self.rng.uniform(rect.left, rect.right, count)
+        self.y[slots] = self.rng.uniform(rect.top, rect.bottom, count)
+        angle = self.rng.uniform(0, 2 * np.pi, count)
+        speed = self.rng.uniform(0.3, 1, count) * DEBRIS_SPEED
+        self.vx[slots] = np.cos(angle) * speed
+        self.vy[slots] = np.sin(angle) * speed
+        self.life[slots] = LIFETIME
+        self.color[slots] = color[:3]
+
+    def update(self):
+        # Всё на месте, без временных массивов; мёртвые частицы тоже двигаются,
+        # это дешевле, чем их отбирать
+        self.vy += GRAVITY
+        self.x += self.vx
+        self.y += self.vy
+        np.subtract(self.life, 1, out=self.life)
+        np.maximum(self.life, 0, out=self.life)
+
+    def draw(self, surface):
+        # Пиксели пишутся напрямую в поверхность. Возвращает прямоугольник,
+        # охватывающий все нарисованные частицы, или None
+        alive = np.flatnonzero(self.life)
+        xs = self.x[alive].astype(np.intp)
+        ys = self.y[alive].astype(np.intp)
+        width, height = surface.get_size()
+        inside = (xs >= 0) & (xs <= width - SIZE) & (ys >= 0) & (ys <= height - SIZE)
+        if not inside.any():
+            return None
+        xs, ys, colors = xs[inside], ys[inside], self.color[alive[inside]]
+
+        pixels = pygame.surfarray.pixels3d(surface)
+        for ox in range(SIZE):
+            for oy in range(SIZE):
+                pixels[xs + ox, ys + oy] = colors
+        del pixels  # снимает блокировку поверхности
+
+        left, top = int(xs.min()), int(ys.min())
+        return pygame.Rect(left, top, int(xs.max()) + SIZE - left, int(ys.max()) + SIZE - top)
@@ -0,0 +1,78 @@
+"""Запись и воспроизведение партий Arcanoid: сид, ввод по тикам и контрольные суммы"""
+import os
+import struct
+import zlib
+
+REPLAY_MAGIC = b'CBRP'
+REPLAY_VERSION = 2  # растёт при изменении физики: старые записи с ней разойдутся
+CHECK_INTERVAL = 60  # тиков между контрольными суммами состояния
+
+# magic, версия, сид, число тиков, число серий ввода, число контрольных сумм;
+# за ним серии (управление, сколько тиков подряд) и суммы (тик, crc32)
+HEADER = struct.Struct('<4sHQIII')
+RUN = struct.Struct('<BH')
+CHECK = struct.Struct('<II')
+MAX_RUN = 0xFFFF
+
+
+def state_checksum(values):
+    # Отпечаток набора чисел состояния; совпадает, только если совпали все биты
+    return zlib.crc32(struct.pack(f'<{len(values)}d', *values))
+
+
+class Replay:
+    def __init__(self, seed, ticks=0, runs=None, checks=None):
+        self.seed = seed
+        self.ticks = ticks
+        self.runs = runs or []  # [управление, длина]: ввод меняется редко, поэтому сериями
+        self.checks = checks or []  # (тик, контрольная сумма)
+
+    def controls(self):
+        # Управление по тикам, по порядку
+        for controls, length in self.runs:
+            for _ in range(length):
+                yield controls
+
+
+class Recorder:
+    # Копит ввод каждого тика; checksum(game) вызывается раз в CHECK_INTERVAL тиков
+    def __init__(self, seed):
+        self.replay = Replay(seed)
+
+    def record(self, controls, game):
+        replay = self.replay
+        last = replay.runs[-1] if replay.runs else None
+        if last is not None and last[0] == controls and last[1] < MAX_RUN:
+            last[1] += 1
+        else:
+            replay.runs.append([controls, 1])
+        replay.ticks += 1
+        if replay.ticks % CHECK_INTERVAL == 0:
+            replay.checks.append((replay.ticks, game.checksum()))
+
+    def save(self, path):
+        write_replay(path, self.replay)
+
+
+def write_replay(path, replay):
+    parts = [HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, replay.seed, replay.ticks,
+                         len(replay.runs), len(replay.checks))]
+    parts.extend(RUN.pack(*run) for run in replay.runs)
+    parts.extend(CHECK.pack(*check) for check in replay.checks)
+    # Пишем во временный файл и подменяем, чтобы не оставить обрезанную запись
+    with open(path + '.tmp', 'wb') as f:
+        f.write(b''.join(parts))
+    os.replace(path + '.tmp', path)
+
+
+def read_replay(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version, seed, ticks, run_count, check_count = HEADER.unpack_from(data)
+    if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+        raise ValueError(f"{path}: неизвестный формат записи")
+    offset = HEADER.size
+    runs = [list(run) for run in RUN.iter_unpack(data[offset:offset + run_count * RUN.size])]
+    offset += run_count * RUN.size
+    checks = list(CHECK.iter_unpack(data[offset:offset + check_count * CHECK.size]))
+    return Replay(seed, ticks, runs, checks)
@@ -0,0 +1,152 @@
+"""Cosmic Breaker без окна: проверка повторов и пакетная симуляция партий ботом для подбора баланса"""
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .game import LEFT, RESTART, RIGHT, TICK_RATE, WIDTH, Game
+from .replay import CHECK_INTERVAL, read_replay
+
+AUTOPILOT_ERROR = 1.25  # промахи бота пакетной симуляции, см. Autopilot
+
+
+def run_replay(path):
+    # Партия пересчитывается без отрисовки так быстро, как получится,
+    # и сверяется с контрольными суммами записи
+    replay = read_replay(path)
+    game = Game(replay.seed)
+    checks = dict(replay.checks)
+    desync = None
+    start = time.perf_counter()
+    for tick, controls in enumerate(replay.controls(), 1):
+        game.update(controls)
+        expected = checks.get(tick)
+        if desync is None and expected is not None and game.checksum() != expected:
+            desync = tick
+    elapsed = time.perf_counter() - start
+    game.levels.shutdown()
+
+    tps = replay.ticks / elapsed if elapsed else float('inf')
+    print(f"Сид: {replay.seed}, тиков: {replay.ticks} за {elapsed:.3f} с — {tps:.0f} тиков/с")
+    print(f"Счет: {game.score}, жизни: {game.lives}, уровень: {game.level_number + 1}")
+    if desync is not None:
+        print(f"Рассинхрон: состояние разошлось с записью между тиками "
+              f"{desync - CHECK_INTERVAL} и {desync}")
+        return 1
+    print("Совпадает с записью")
+    return 0
+
+
+class Autopilot:
+    # Ракетка под управлением скрипта: встречает ближайший падающий мяч там,
+    # куда он прилетит с учётом отскоков от стен. error — разброс точки встречи
+    # в долях полуширины ракетки: при error > 1 бот иногда промахивается
+    def __init__(self, rng, error=AUTOPILOT_ERROR):
+        self.rng = rng
+        self.error = error
+        self.aim = 0.0
+        self.falling = False
+
+    def controls(self, game):
+        if game.game_over:
+            return 0
+        if game.level_complete:
+            return RESTART
+
+        ball = None
+        for candidate in game.balls:
+            if candidate.dy > 0 and (ball is None or candidate.y > ball.y):
+                ball = candidate
+        if ball is not None and not self.falling:
+            # Новый заход мяча — новая ошибка прицела
+            reach = game.paddle_width / 2 + game.ball_radius
+            self.aim = self.rng.uniform(-self.error, self.error) * reach
+        self.falling = ball is not None
+        if ball is None:
+            return 0
+
+        # Где мяч пересечёт линию ракетки: прямая, сложенная отражениями от стен
+        landing = ball.x + ball.dx * (game.paddle_y - ball.y) / ball.dy
+        span = WIDTH - 2 * game.ball_radius
+        landing = (landing - game.ball_radius) % (2 * span)
+        if landing > span:
+            landing = 2 * span - landing
+        target = landing + game.ball_radius + self.aim
+
+        center = game.paddle_x + game.paddle_width / 2
+        if center < target - game.paddle_speed / 2:
+            return RIGHT
+        if center > target + game.paddle_speed / 2:
+            return LEFT
+        return 0
+
+
+def play_game(game, pilot, seed, max_ticks):
+    # Одна партия от начала до проигрыша или max_ticks.
+    # Возвращает (тиков, счёт, потеряно жизней, пройдено уровней)
+    game.seed = seed
+    game.rng.seed(seed)
+    pilot.rng.seed(seed + 1)
+    game.reset_game()
+    lives = game.lives
+    tick = 0
+    while tick < max_ticks and not game.game_over:
+        game.update(pilot.controls(game))
+        tick += 1
+    return tick, game.score, lives - game.lives, game.level_number + game.level_complete
+
+
+# Игра и бот в процессе-работнике создаются один раз и переиспользуются
+worker = None
+
+
+def init_worker(tuning, error, max_ticks):
+    global worker
+    game = Game(**tuning)
+    worker = (game, Autopilot(random.Random(), error), max_ticks)
+
+
+def play_seeds(seeds):
+    game, pilot, max_ticks = worker
+    return [play_game(game, pilot, seed, max_ticks) for seed in seeds]
+
+
+def describe(name, values):
+    ordered = sorted(values)
+    count = len(ordered)
+    mean = sum(ordered) / count
+    p10, p50, p90 = (ordered[min(count - 1, int(p * count))] for p in (0.1, 0.5, 0.9))
+    print(f"{name:<22} {mean:>9.1f} {p10:>9} {p50:>9} {p90:>9} {ordered[-1]:>9}")
+
+
+def run_batch(games, workers=None, seed=0, max_ticks=36000, error=AUTOPILOT_ERROR,
+              batch_size=64, **tuning):
+    # Тысячи партий без окна на всех ядрах; печатает распределения длины партии,
+    # счёта, потерянных жизней и пройденных уровней
+    workers = workers or os.cpu_count()
+    seeds = list(range(seed, seed + games))
+    chunks = [seeds[i:i + batch_size] for i in range(0, games, batch_size)]
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(workers, initializer=init_worker,
+                             initargs=(tuning, error, max_ticks)) as pool:
+        for chunk in pool.map(play_seeds, chunks):
+            results.extend(chunk)
+    elapsed = time.perf_counter() - start
+
+    ticks = [result[0] for result in results]
+    settings = ", ".join(f"{name}={value}" for name, value in sorted(tuning.items()))
+    print(f"Партий: {games} за {elapsed:.1f} с на {workers} процессах — "
+          f"{games / elapsed:.0f} партий/с, {sum(ticks) / elapsed:.0f} тиков/с")
+    print(f"Параметры: {settings or 'по умолчанию'}, ошибка бота {error}")
+    print(f"{'':<22} {'среднее':>9} {'p10':>9} {'p50':>9} {'p90':>9} {'макс':>9}")
+    describe("длина партии, с", [tick // TICK_RATE for tick in ticks])
+    describe("счёт", [result[1] for result in results])
+    # Партия идёт до конца жизней, поэтому их потеряно почти всегда столько же,
+    # сколько было; о балансе говорит то, сколько держится одна жизнь
+    describe("секунд на жизнь", [tick // (TICK_RATE * max(lost, 1))
+                                 for tick, _, lost, _ in results])
+    describe("пройдено уровней", [result[3] for result in results])
+    timeouts = sum(1 for tick in ticks if tick >= max_ticks)
+    if timeouts:
+        print(f"Не закончились за {max_ticks} тиков: {timeouts}")
@@ -0,0 +1,81 @@
+"""Текст для HUD: шрифты загружаются один раз, символы — в атласе, строки — в LRU-кэше"""
+from collections import OrderedDict
+
+import pygame
+
+CACHE_SIZE = 256  # сколько готовых строк держать
+ATLAS_WIDTH = 512
+
+
+class GlyphAtlas:
+    # Все символы одного шрифта и цвета на одной поверхности. Строка собирается
+    # одним вызовом Surface.blits без растеризации шрифта (кернинг не учитывается)
+    def __init__(self, font, color):
+        self.font = font
+        self.color = color
+        self.height = font.get_height()
+        self.surface = pygame.Surface((ATLAS_WIDTH, self.height), pygame.SRCALPHA)
+        self.rects = {}  # символ -> область в атласе
+        self.cursor = 0
+
+    def glyph(self, char):
+        rect = self.rects.get(char)
+        if rect is None:
+            image = self.font.render(char, True, self.color)
+            width = image.get_width()
+            if self.cursor + width > self.surface.get_width():
+                # Атлас кончился — удваиваем ширину, старые символы остаются на местах
+                grown = pygame.Surface((max(self.surface.get_width() * 2, self.cursor + width),
+                                        self.height), pygame.SRCALPHA)
+                grown.blit(self.surface, (0, 0))
+                self.surface = grown
+            self.surface.blit(image, (self.cursor, 0))
+            rect = pygame.Rect(self.cursor, 0, width, self.height)
+            self.rects[char] = rect
+            self.cursor += width
+        return rect
+
+    def render(self, text):
+        rects = [self.glyph(char) for char in text]
+        surface = pygame.Surface((sum(rect.width for rect in rects), self.height), pygame.SRCALPHA)
+        blits = []
+        x = 0
+        for rect in rects:
+            # MAX вместо смешивания: символы не перекрываются, пиксели копируются как есть
+            blits.append((self.surface, (x, 0), rect, pygame.BLEND_RGBA_MAX))
+            x += rect.width
+        surface.blits(blits, doreturn=False)
+        return surface
+
+
+class TextRenderer:
+    def __init__(self, cache_size=CACHE_SIZE):
+        self.cache_size = cache_size
+        self.fonts = {}  # (имя, размер) -> Font
+        self.atlases = {}  # (имя, размер, цвет) -> GlyphAtlas
+        self.cache = OrderedDict()  # (текст, имя, размер, цвет) -> Surface
+
+    def font(self, size, name=None):
+        # name=None — встроенный шрифт pygame, иначе системный (SysFont ищет его долго)
+        font = self.fonts.get((name, size))
+        if font is None:
+            font = pygame.font.SysFont(name, size) if name else pygame.font.Font(None, size)
+            self.fonts[(name, size)] = font
+        return font
+
+    def render(self, text, size, color, name=None):
+        # Пока текст не меняется (счёт, инвентарь), возвращается та же поверхность
+        key = (text, name, size, tuple(color))
+        surface = self.cache.get(key)
+        if surface is not None:
+            self.cache.move_to_end(key)
+            return surface
+
+        atlas = self.atlases.get(key[1:])
+        if atlas is None:
+            atlas = self.atlases[key[1:]] = GlyphAtlas(self.font(size, name), color)
+        surface = atlas.render(text)
+        self.cache[key] = surface
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return surface
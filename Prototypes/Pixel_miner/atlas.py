@@ -0,0 +1,77 @@
+"""Текстуры блоков: все тайлы на одной поверхности, отрисовка пачками через Surface.blits"""
+import os
+
+import numpy as np
+import pygame
+
+GRAIN = 3  # сторона «пикселя» пиксель-арта в экранных пикселях
+
+
+def noise_texture(size, color, seed, specks=None, border=None):
+    # Процедурная текстура: цвет с зерном шума, пятна руды цвета specks и рамка.
+    # Сид фиксирован для типа блока, поэтому текстура от запуска к запуску одна и та же
+    rng = np.random.default_rng(seed)
+    cells = max(1, size // GRAIN)
+    shade = rng.integers(-16, 17, (cells, cells, 1))
+    pixels = np.clip(np.array(color, dtype=np.int32) + shade, 0, 255)
+    if specks is not None:
+        # Руда — несколько сгустков по 2-3 клетки
+        for _ in range(max(2, cells // 3)):
+            x, y = rng.integers(0, cells - 1, 2)
+            pixels[x:x + 2, y:y + 2] = specks
+            pixels[x, y] = np.clip(np.array(specks) + 40, 0, 255)
+    surface = pygame.transform.scale(pygame.surfarray.make_surface(pixels.astype(np.uint8)),
+                                     (size, size))
+    if border is not None:
+        pygame.draw.rect(surface, border, surface.get_rect(), 1)
+    return surface
+
+
+class TileAtlas:
+    # Текстуры всех типов блоков на одной поверхности: тайл рисуется blit'ом
+    # области атласа, а целый чанк — одним вызовом Surface.blits
+    def __init__(self, size):
+        self.size = size
+        self.surface = pygame.Surface((0, size))
+        self.rects = {}  # тип блока -> область в атласе
+
+    def add(self, key, image):
+        if image.get_size() != (self.size, self.size):
+            image = pygame.transform.scale(image, (self.size, self.size))
+        rect = self.rects.get(key)
+        if rect is None:
+            # Атлас — полоса тайлов; растёт вправо, старые тайлы остаются на местах
+            rect = pygame.Rect(self.surface.get_width(), 0, self.size, self.size)
+            grown = pygame.Surface((rect.right, self.size))
+            grown.blit(self.surface, (0, 0))
+            self.surface = grown
+            self.rects[key] = rect
+        self.surface.blit(image, rect)
+
+    def load(self, key, path):
+        # Нарисованная текстура из файла; False — файла нет, остаётся процедурная
+        if not os.path.exists(path):
+            return False
+        self.add(key, pygame.image.load(path))
+        return True
+
+    def convert(self):
+        # Под формат экрана: иначе каждый blit переводит пиксели заново
+        self.surface = self.surface.convert()
+        return self
+
+    def scaled(self, size):
+        # Тот же набор текстур другого размера (например, для выпавших предметов)
+        atlas = TileAtlas(size)
+        for key, rect in self.rects.items():
+            atlas.add(key, self.surface.subsurface(rect))
+        return atlas
+
+    def blit(self, surface, key, position):
+        surface.blit(self.surface, position, self.rects[key])
+
+    def blits(self, surface, keys, xs, ys):
+        # Тайлы keys[i] в точки (xs[i], ys[i]) одним вызовом
+        atlas, rects = self.surface, self.rects
+        surface.blits([(atlas, (x, y), rects[key]) for key, x, y in zip(keys, xs, ys)],
+                      doreturn=False)
@@ -0,0 +1,124 @@
+"""Физика блоков Pixel Miner: песок и гравий падают, вода течёт. Считаются только активные клетки"""
+import numpy as np
+
+from terrain import CHUNK_SIZE, EMPTY, SAND, GRAVEL, WATER
+
+# Блоки, которые могут сдвинуться сами
+DYNAMIC = np.zeros(256, dtype=bool)
+DYNAMIC[[SAND, GRAVEL, WATER]] = True
+# Что падающий блок вытесняет, проваливаясь вниз
+DISPLACEABLE = (EMPTY, WATER)
+# Потолок обновлений за тик: при большом обвале остаток переходит на следующие тики
+MAX_UPDATES = 4096
+# На сколько клеток вода ищет в стороне, куда стечь
+FLOW_DISTANCE = 8
+
+
+class BlockPhysics:
+    # Активные клетки хранятся по чанкам: {(chunk_x, chunk_y): {(x, y), ...}}.
+    # Клетка становится активной, когда рядом с ней меняется блок (через World.listeners),
+    # и остаётся активной, пока двигается. Чанк без активных клеток спит и ничего не стоит,
+    # поэтому тик стоит столько, сколько в мире движения, а не сколько загружено чанков
+    def __init__(self, world):
+        self.world = world
+        self.awake = {}
+        self.tick = 0
+        self.updates = 0  # клеток обработано за последний тик
+        world.listeners.append(self.on_block_changed)
+        world.chunk_listeners.append(self.on_chunk_added)
+
+    def on_block_changed(self, x0, y0, x1, y1):
+        # Изменение могло лишить опоры блок сверху или открыть путь воде сбоку;
+        # вода смотрит вдаль на FLOW_DISTANCE клеток, поэтому будим и её
+        self.activate(x0 - FLOW_DISTANCE, y0 - 1, x1 + FLOW_DISTANCE, y1 + 1)
+
+    def on_chunk_added(self, chunk_x, chunk_y):
+        # Генератор кладёт песок и гравий над пещерами, а под чанком, выгруженным
+        # посреди обвала, мог появиться воздух: новый чанк будится целиком, как будто
+        # в нём изменились все блоки. Улёгшееся засыпает после первого же тика
+        x0, y0 = chunk_x * CHUNK_SIZE, chunk_y * CHUNK_SIZE
+        self.on_block_changed(x0, y0, x0 + CHUNK_SIZE, y0 + CHUNK_SIZE)
+
+    def activate(self, x0, y0, x1, y1):
+        # Будит подвижные блоки прямоугольника в загруженных чанках
+        for chunk_x, chunk_y, chunk_part, _ in self.world.iter_region(x0, y0, x1, y1):
+            chunk = self.world.chunks.get((chunk_x, chunk_y))
+            if chunk is None:
+                continue
+            rows, cols = chunk_part
+            local_ys, local_xs = np.nonzero(DYNAMIC[chunk[chunk_part]])
+            if local_ys.size:
+                cells = self.awake.setdefault((chunk_x, chunk_y), set())
+                base_x = chunk_x * CHUNK_SIZE + cols.start
+                base_y = chunk_y * CHUNK_SIZE + rows.start
+                cells.update(zip((base_x + local_xs).tolist(), (base_y + local_ys).tolist()))
+
+    def update(self):
+        # Один тик: чанки обрабатываются пачками, клетки чанка — снизу вверх, чтобы
+        # столб песка сдвигался за тик целиком. Клетки, разбуженные ходами этого тика,
+        # ждут следующего, поэтому блок сдвигается не больше чем на клетку за тик
+        self.tick += 1
+        self.updates = 0
+        awake, self.awake = self.awake, {}
+        while awake and self.updates < MAX_UPDATES:
+            key, cells = awake.popitem()
+            chunk = self.world.chunks.get(key)
+            if chunk is None:
+                continue  # чанк выгружен — его клетки засыпают
+            base_x, base_y = key[0] * CHUNK_SIZE, key[1] * CHUNK_SIZE
+            for x, y in sorted(cells, key=lambda cell: -cell[1]):
+                block_type = int(chunk[y - base_y, x - base_x])
+                if block_type == WATER:
+                    self.flow(x, y)
+                elif DYNAMIC[block_type]:
+                    self.fall(x, y, block_type)
+            self.updates += len(cells)
+        # Что не успели за тик, остаётся активным
+        for key, cells in awake.items():
+            self.awake.setdefault(key, set()).update(cells)
+
+    def block_at(self, x, y):
+        # Блок загруженного чанка; None — чанка нет в памяти, туда не двигаемся
+        chunk = self.world.chunks.get((x // CHUNK_SIZE, y // CHUNK_SIZE))
+        return None if chunk is None else int(chunk[y % CHUNK_SIZE, x % CHUNK_SIZE])
+
+    def move(self, x, y, to_x, to_y, block_type):
+        # Блок меняется местами с тем, что было на новом месте (воздух или вода)
+        self.world.set_block(x, y, self.block_at(to_x, to_y))
+        self.world.set_block(to_x, to_y, block_type)
+
+    def fall(self, x, y, block_type):
+        if self.block_at(x, y + 1) in DISPLACEABLE:
+            self.move(x, y, x, y + 1, block_type)
+        elif block_type == SAND:
+            # Песок осыпается с горки, гравий держит отвесную стенку
+            for dx in self.sides(x, y):
+                if (self.block_at(x + dx, y) in DISPLACEABLE and
+                        self.block_at(x + dx, y + 1) in DISPLACEABLE):
+                    self.move(x, y, x + dx, y + 1, block_type)
+                    return
+
+    def flow(self, x, y):
+        if self.block_at(x, y + 1) == EMPTY:
+            self.move(x, y, x, y + 1, WATER)
+            return
+        # В стороны вода течёт, только если её давит вода сверху или неподалёку есть
+        # куда стечь: так лужа растекается в слой и успокаивается, а не бродит вечно
+        pressed = self.block_at(x, y - 1) == WATER
+        for dx in self.sides(x, y):
+            if self.block_at(x + dx, y) == EMPTY and (pressed or self.drop_ahead(x, y, dx)):
+                self.move(x, y, x + dx, y, WATER)
+                return
+
+    def drop_ahead(self, x, y, dx):
+        # Есть ли в направлении dx по свободным клеткам место, где вода упадёт ниже
+        for step in range(1, FLOW_DISTANCE + 1):
+            if self.block_at(x + dx * step, y) != EMPTY:
+                return False
+            if self.block_at(x + dx * step, y + 1) == EMPTY:
+                return True
+        return False
+
+    def sides(self, x, y):
+        # Сторона, куда клетка пробует сдвинуться первой, чередуется по тикам
+        return (1, -1) if (x + y + self.tick) % 2 else (-1, 1)
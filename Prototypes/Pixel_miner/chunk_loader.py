@@ -0,0 +1,67 @@
+"""Фоновая генерация чанков Pixel Miner в пуле процессов"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from terrain import CHUNK_SIZE, generate_chunks
+
+# Запас в чанках вокруг обзора
+PREFETCH_MARGIN = 1
+# На сколько кадров вперёд по скорости игрока догружать мир
+LOOKAHEAD_FRAMES = 90
+
+
+class ChunkLoader:
+    def __init__(self, world, view_width, view_height, workers=None):
+        self.world = world
+        # Размер обзора в тайлах
+        self.view_width = view_width
+        self.view_height = view_height
+        self.workers = workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        self.pending = set()  # чанки, которые сейчас генерируются
+        self.batches = {}  # Future -> список координат пачки
+
+    def request(self, coords):
+        coords = [key for key in dict.fromkeys(coords)
+                  if key not in self.pending and self.world.peek_chunk(*key) is None]
+        # Делим заявку на пачки по числу процессов
+        for i in range(min(self.workers, len(coords))):
+            batch = coords[i::self.workers]
+            future = self.executor.submit(generate_chunks, self.world.seed, batch)
+            self.batches[future] = batch
+            self.pending.update(batch)
+
+    def collect(self):
+        # Переносим готовые чанки в мир; если чанк успели сгенерировать
+        # синхронно (например, для коллизий) или он сохранён на диске, оставляем его
+        for future in [future for future in self.batches if future.done()]:
+            batch = self.batches.pop(future)
+            self.pending.difference_update(batch)
+            for (chunk_x, chunk_y), chunk in zip(batch, future.result()):
+                if self.world.peek_chunk(chunk_x, chunk_y) is None:
+                    self.world.add_chunk(chunk_x, chunk_y, chunk)
+
+    def chunks_around(self, center_x, center_y):
+        start_x = int((center_x - self.view_width / 2) // CHUNK_SIZE) - PREFETCH_MARGIN
+        end_x = int((center_x + self.view_width / 2) // CHUNK_SIZE) + PREFETCH_MARGIN
+        start_y = int((center_y - self.view_height / 2) // CHUNK_SIZE) - PREFETCH_MARGIN
+        end_y = int((center_y + self.view_height / 2) // CHUNK_SIZE) + PREFETCH_MARGIN
+        return [(chunk_x, chunk_y)
+                for chunk_y in range(start_y, end_y + 1)
+                for chunk_x in range(start_x, end_x + 1)]
+
+    def update(self, center_x, center_y, vx=0, vy=0):
+        self.collect()
+
+        # Кольцо вокруг камеры плюс такое же окно там, где игрок окажется
+        # через LOOKAHEAD_FRAMES кадров при текущей скорости
+        wanted = self.chunks_around(center_x, center_y)
+        wanted += self.chunks_around(center_x + vx * LOOKAHEAD_FRAMES,
+                                     center_y + vy * LOOKAHEAD_FRAMES)
+        center_chunk_x = center_x // CHUNK_SIZE
+        center_chunk_y = center_y // CHUNK_SIZE
+        wanted.sort(key=lambda key: abs(key[0] - center_chunk_x) + abs(key[1] - center_chunk_y))
+        self.request(wanted)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,48 @@
+"""Столкновения прямоугольника с тайловым миром Pixel Miner (swept AABB)"""
+import math
+
+import numpy as np
+
+from terrain import SOLID
+
+# Допуск на погрешность float: бокс, прижатый к тайлу, не считается вошедшим в него
+EPS = 1e-6
+
+
+def sweep_axis(world, pos, size, delta, lo, hi, vertical):
+    # Сдвиг по одной оси: pos/size/delta — вдоль движения, [lo, hi) — тайлы,
+    # которые бокс занимает по другой оси. Смотрим только тайлы, в которые
+    # бокс войдёт за этот шаг, поэтому сквозь стену не проскочить на любой скорости.
+    # Возвращает новую позицию и нормаль контакта (-1, 1 или 0 без касания)
+    if delta > 0:
+        start = math.ceil(pos + size - EPS)
+        end = math.ceil(pos + size + delta - EPS)
+    else:
+        start = math.floor(pos + delta + EPS)
+        end = math.floor(pos + EPS)
+    if start >= end or lo >= hi:
+        return pos + delta, 0
+
+    if vertical:
+        solid = SOLID[world.get_region(lo, start, hi, end)].any(axis=1)
+    else:
+        solid = SOLID[world.get_region(start, lo, end, hi)].any(axis=0)
+    hits = np.flatnonzero(solid)
+    if not hits.size:
+        return pos + delta, 0
+    if delta > 0:
+        return start + int(hits[0]) - size, -1
+    return start + int(hits[-1]) + 1, 1
+
+
+def move_aabb(world, x, y, width, height, dx, dy):
+    # Сначала по X, потом по Y; возвращает (x, y, normal_x, normal_y).
+    # normal_y == -1 — бокс стоит на земле, 1 — упёрся в потолок
+    normal_x = normal_y = 0
+    if dx:
+        rows = (math.floor(y + EPS), math.ceil(y + height - EPS))
+        x, normal_x = sweep_axis(world, x, width, dx, rows[0], rows[1], False)
+    if dy:
+        columns = (math.floor(x + EPS), math.ceil(x + width - EPS))
+        y, normal_y = sweep_axis(world, y, height, dy, columns[0], columns[1], True)
+    return x, y, normal_x, normal_y
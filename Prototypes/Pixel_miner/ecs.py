@@ -0,0 +1,166 @@
+"""Сущности Pixel Miner: игрок, выпавшие предметы, мобы — в непрерывных массивах numpy"""
+import numpy as np
+
+from collision import EPS, move_aabb
+from terrain import EMPTY, SOLID
+
+# Виды сущностей
+PLAYER = 0
+ITEM = 1
+
+GRAVITY = 0.01
+MAX_FALL_SPEED = 0.3
+GROUND_FRICTION = 0.8
+
+ITEM_SIZE = 0.4
+
+# Меньше стольких сущностей пачкой считать невыгодно: накладные расходы numpy
+# на крошечных массивах больше, чем обход по одной
+BATCH_MIN = 16
+
+
+class EntityField:
+    # Атрибут обёртки (например, Player), хранящийся в массиве Entities
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        return getattr(obj.entities, self.name)[obj.id].item()
+
+    def __set__(self, obj, value):
+        getattr(obj.entities, self.name)[obj.id] = value
+
+
+class Entities:
+    # Struct of arrays: i-я сущность — это i-е элементы всех массивов.
+    # Физика считается сразу для всех сущностей операциями над массивами
+    FIELDS = {
+        'x': np.float64, 'y': np.float64,  # левый верхний угол хитбокса, в тайлах
+        'vx': np.float64, 'vy': np.float64,
+        'width': np.float64, 'height': np.float64,
+        'alive': np.bool_, 'gravity': np.bool_, 'on_ground': np.bool_,
+        'kind': np.uint8,
+        'block': np.uint8,  # тип блока у выпавшего предмета
+    }
+
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self.count = 0  # сущности живут в индексах [0, count)
+        self.free = []
+        for name, dtype in self.FIELDS.items():
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+
+    def grow(self):
+        for name in self.FIELDS:
+            old = getattr(self, name)
+            new = np.zeros(self.capacity * 2, dtype=old.dtype)
+            new[:self.capacity] = old
+            setattr(self, name, new)
+        self.capacity *= 2
+
+    def spawn(self, kind, x, y, width, height, vx=0.0, vy=0.0, block=EMPTY, gravity=True):
+        if self.free:
+            index = self.free.pop()
+        else:
+            if self.count == self.capacity:
+                self.grow()
+            index = self.count
+            self.count += 1
+        self.x[index], self.y[index] = x, y
+        self.vx[index], self.vy[index] = vx, vy
+        self.width[index], self.height[index] = width, height
+        self.alive[index] = True
+        self.gravity[index] = gravity
+        self.on_ground[index] = False
+        self.kind[index] = kind
+        self.block[index] = block
+        return index
+
+    def spawn_item(self, x, y, block, vx=0.0, vy=0.0):
+        return self.spawn(ITEM, x, y, ITEM_SIZE, ITEM_SIZE, vx, vy, block)
+
+    def despawn(self, index):
+        self.alive[index] = False
+        self.free.append(index)
+
+    def living(self, kind=None):
+        mask = self.alive[:self.count]
+        if kind is not None:
+            mask = mask & (self.kind[:self.count] == kind)
+        return np.flatnonzero(mask)
+
+    def touching(self, index, kind):
+        # Живые сущности вида kind, чьи хитбоксы пересекаются с хитбоксом index
+        others = self.living(kind)
+        others = others[others != index]
+        x, y = self.x[index], self.y[index]
+        hit = ((self.x[others] < x + self.width[index]) & (x < self.x[others] + self.width[others]) &
+               (self.y[others] < y + self.height[index]) & (y < self.y[others] + self.height[others]))
+        return others[hit]
+
+    def update(self, world):
+        alive = self.living()
+        falling = alive[self.gravity[alive]]
+        self.vy[falling] = np.minimum(self.vy[falling] + GRAVITY, MAX_FALL_SPEED)
+
+        # Мелкие и медленные (бокс не больше тайла, скорость меньше тайла за тик)
+        # за тик входят максимум в одну новую линию тайлов — их считаем пачкой.
+        # Остальных ведём по одному обычным swept AABB
+        small = ((self.width[alive] <= 1) & (self.height[alive] <= 1) &
+                 (np.abs(self.vx[alive]) < 1) & (np.abs(self.vy[alive]) < 1))
+        if np.count_nonzero(small) < BATCH_MIN:
+            small[:] = False
+        batch = alive[small]
+        self.on_ground[alive] = False
+        self.sweep(world, batch, vertical=False)
+        self.sweep(world, batch, vertical=True)
+        for index in alive[~small]:
+            self.x[index], self.y[index], normal_x, normal_y = move_aabb(
+                world, self.x[index], self.y[index], self.width[index], self.height[index],
+                self.vx[index], self.vy[index])
+            if normal_x:
+                self.vx[index] = 0
+            if normal_y:
+                self.vy[index] = 0
+            self.on_ground[index] = normal_y < 0
+
+        grounded = alive[self.on_ground[alive]]
+        self.vx[grounded] *= GROUND_FRICTION
+
+    def sweep(self, world, indices, vertical):
+        if vertical:
+            pos, size, vel, other, other_size = self.y, self.height, self.vy, self.x, self.width
+        else:
+            pos, size, vel, other, other_size = self.x, self.width, self.vx, self.y, self.height
+        indices = indices[vel[indices] != 0]
+        if not indices.size:
+            return
+        p, s, v = pos[indices], size[indices], vel[indices]
+        forward = v > 0
+
+        # Линия тайлов, где сейчас и где окажется передний край бокса
+        lead_now = np.where(forward, np.ceil(p + s - EPS) - 1, np.floor(p + EPS))
+        lead_new = np.where(forward, np.ceil(p + s + v - EPS) - 1, np.floor(p + v + EPS))
+        crossing = lead_new != lead_now
+
+        # Бокс не больше тайла занимает по другой оси одну или две линии
+        o, os_ = other[indices[crossing]], other_size[indices[crossing]]
+        line = lead_new[crossing].astype(np.int64)
+        first = np.floor(o + EPS).astype(np.int64)
+        last = np.ceil(o + os_ - EPS).astype(np.int64) - 1
+        across = np.concatenate([first, last])
+        along = np.concatenate([line, line])
+        if vertical:
+            blocks = world.get_blocks(across, along)
+        else:
+            blocks = world.get_blocks(along, across)
+        solid = SOLID[blocks].reshape(2, -1).any(axis=0)
+        blocked = np.zeros(indices.size, dtype=bool)
+        blocked[crossing] = solid
+
+        pos[indices] = np.where(blocked, np.where(forward, lead_new - s, lead_new + 1), p + v)
+        vel[indices[blocked]] = 0
+        if vertical:
+            self.on_ground[indices[blocked & forward]] = True
@@ -41,12 +41,12 @@ def check_pip():
         return False
 
 def install_pygame():
-    """Устанавливает pygame"""
-    print(" Установка библиотеки pygame...")
+    """Устанавливает pygame и numpy"""
+    print(" Установка библиотек pygame и numpy...")
     try:
-        subprocess.run([sys.executable, "-m", "pip", "install", "pygame"], 
+        subprocess.run([sys.executable, "-m", "pip", "install", "pygame", "numpy"], 
                       check=True)
-        print(" Pygame успешно установлен")
+        print(" Pygame и numpy успешно установлены")
         return True
     except subprocess.CalledProcessError as e:
         print(f" Ошибка установки pygame: {e}")
@@ -56,6 +56,11 @@ def create_game_files():
     """Создает файлы игры"""
     print(" Создание файлов игры...")
     
+    # Не затираем уже установленную (возможно, более новую) версию игры
+    if os.path.exists("pixel_miner.py"):
+        print(" Файлы игры уже на месте")
+        return
+    
     # Основной файл игры
     game_code = '''import pygame
 import random
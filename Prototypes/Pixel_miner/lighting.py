@@ -0,0 +1,174 @@
+"""Освещение Pixel Miner: уровни света по тайлам, заливка в ширину от неба и светящихся блоков"""
+from collections import deque
+
+import numpy as np
+
+from terrain import CHUNK_SIZE, SURFACE_LEVEL, SOLID, DIAMOND
+
+MAX_LIGHT = 15  # свет неба; вниз по прозрачным тайлам он идёт без ослабления
+# Светящиеся блоки и их яркость (меньше MAX_LIGHT)
+LIGHT_SOURCES = {DIAMOND: 6}
+
+# Соседи тайла: (dx, dy, вниз ли)
+NEIGHBOURS = ((1, 0, False), (-1, 0, False), (0, 1, True), (0, -1, False))
+
+
+class LightMap:
+    # Уровень света 0..MAX_LIGHT на каждый тайл. Карты лежат в world.light рядом с чанками
+    # и выгружаются вместе с ними; считаются только для загруженных чанков, по запросу.
+    # Свет не генерирует и не загружает чанки: за границей освещённых чанков он
+    # останавливается и втекает обратно, когда соседний чанк осветят
+    def __init__(self, world):
+        self.world = world
+        # Подписчики: функция(chunk_x, chunk_y), свет в чанке изменился
+        self.listeners = []
+        self.changed = set()
+        world.listeners.append(self.on_block_changed)
+
+    def chunk_light(self, chunk_x, chunk_y):
+        # Карта света загруженного чанка; None — чанк не в памяти
+        levels = self.world.light.get((chunk_x, chunk_y))
+        if levels is None and (chunk_x, chunk_y) in self.world.chunks:
+            # Свет приходит сверху: сначала освещаем загруженные чанки над этим
+            column = []
+            while (chunk_x, chunk_y) in self.world.chunks and (chunk_x, chunk_y) not in self.world.light:
+                column.append(chunk_y)
+                chunk_y -= 1
+            for chunk_y in reversed(column):
+                levels = self.light_chunk(chunk_x, chunk_y)
+            self.flush()
+        return levels
+
+    def light_chunk(self, chunk_x, chunk_y):
+        chunk = self.world.chunks[(chunk_x, chunk_y)]
+        levels = np.zeros((CHUNK_SIZE, CHUNK_SIZE), dtype=np.uint8)
+        self.world.light[(chunk_x, chunk_y)] = levels
+        base_x, base_y = chunk_x * CHUNK_SIZE, chunk_y * CHUNK_SIZE
+        queue = deque()
+
+        # Источники внутри чанка
+        for block_type, level in LIGHT_SOURCES.items():
+            for local_y, local_x in zip(*np.nonzero(chunk == block_type)):
+                levels[local_y, local_x] = level
+                queue.append((base_x + int(local_x), base_y + int(local_y)))
+        if self.sky_above(chunk_x, chunk_y):
+            for local_x in np.flatnonzero(~SOLID[chunk[0]]):
+                levels[0, local_x] = MAX_LIGHT
+                queue.append((base_x + int(local_x), base_y))
+
+        # Свет уже освещённых соседей втекает через общие края
+        last = CHUNK_SIZE - 1
+        edges = (((-1, 0), (slice(None), last)), ((1, 0), (slice(None), 0)),
+                 ((0, -1), (last, slice(None))), ((0, 1), (0, slice(None))))
+        for (dx, dy), edge in edges:
+            neighbour = self.world.light.get((chunk_x + dx, chunk_y + dy))
+            if neighbour is None:
+                continue
+            for index in np.flatnonzero(neighbour[edge]):
+                local_x = last if dx < 0 else 0 if dx > 0 else index
+                local_y = last if dy < 0 else 0 if dy > 0 else index
+                queue.append(((chunk_x + dx) * CHUNK_SIZE + int(local_x),
+                              (chunk_y + dy) * CHUNK_SIZE + int(local_y)))
+
+        self.changed.add((chunk_x, chunk_y))
+        self.spread(queue)
+        return levels
+
+    def sky_above(self, chunk_x, chunk_y):
+        # Над неосвещённым чанком выше поверхности считаем открытое небо
+        return ((chunk_x, chunk_y - 1) not in self.world.light and
+                chunk_y * CHUNK_SIZE <= SURFACE_LEVEL)
+
+    def source_level(self, world_x, world_y, block_type):
+        level = LIGHT_SOURCES.get(block_type, 0)
+        if (not SOLID[block_type] and world_y % CHUNK_SIZE == 0 and
+                self.sky_above(world_x // CHUNK_SIZE, world_y // CHUNK_SIZE)):
+            level = MAX_LIGHT
+        return level
+
+    def cell(self, world_x, world_y):
+        # (карта света, чанк, y, x внутри чанка) или None, если чанк не освещён
+        key = (world_x // CHUNK_SIZE, world_y // CHUNK_SIZE)
+        levels = self.world.light.get(key)
+        if levels is None:
+            return None
+        return levels, self.world.chunks[key], world_y % CHUNK_SIZE, world_x % CHUNK_SIZE
+
+    def get(self, world_x, world_y):
+        cell = self.cell(world_x, world_y)
+        return 0 if cell is None else int(cell[0][cell[2], cell[3]])
+
+    def spread(self, queue):
+        # Заливка в ширину: свет растекается, пока соседу есть что добавить.
+        # Прозрачный тайл (воздух, вода) передаёт свой уровень, светящийся — свою яркость,
+        # остальные блоки освещаются с краёв, но свет дальше не пропускают
+        while queue:
+            x, y = queue.popleft()
+            levels, chunk, local_y, local_x = self.cell(x, y)
+            block_type = int(chunk[local_y, local_x])
+            if not SOLID[block_type]:
+                level = int(levels[local_y, local_x])
+            else:
+                level = LIGHT_SOURCES.get(block_type, 0)
+            if level <= 1:
+                continue
+            for dx, dy, down in NEIGHBOURS:
+                cell = self.cell(x + dx, y + dy)
+                if cell is None:
+                    continue
+                target = level if down and level == MAX_LIGHT else level - 1
+                neighbour, _, ny, nx = cell
+                if neighbour[ny, nx] < target:
+                    neighbour[ny, nx] = target
+                    self.changed.add(((x + dx) // CHUNK_SIZE, (y + dy) // CHUNK_SIZE))
+                    queue.append((x + dx, y + dy))
+
+    def relight(self, tiles):
+        # Пересчёт после изменения блоков: сначала гасим всё, что могло светить
+        # через эти тайлы (уровень ниже, чем у погашенного соседа), затем заливаем
+        # заново от уцелевшего света на границе погашенной области и от источников
+        dark = deque()
+        unlit = []
+        for x, y in tiles:
+            cell = self.cell(x, y)
+            if cell is not None:
+                levels, _, local_y, local_x = cell
+                dark.append((x, y, int(levels[local_y, local_x])))
+                levels[local_y, local_x] = 0
+                self.changed.add((x // CHUNK_SIZE, y // CHUNK_SIZE))
+        refill = deque()
+        while dark:
+            x, y, old = dark.popleft()
+            unlit.append((x, y))
+            for dx, dy, down in NEIGHBOURS:
+                cell = self.cell(x + dx, y + dy)
+                if cell is None:
+                    continue
+                levels, _, ny, nx = cell
+                level = int(levels[ny, nx])
+                if not level:
+                    continue
+                if level < old or (down and level == old == MAX_LIGHT):
+                    levels[ny, nx] = 0
+                    self.changed.add(((x + dx) // CHUNK_SIZE, (y + dy) // CHUNK_SIZE))
+                    dark.append((x + dx, y + dy, level))
+                else:
+                    refill.append((x + dx, y + dy))
+
+        for x, y in unlit:
+            levels, chunk, local_y, local_x = self.cell(x, y)
+            level = self.source_level(x, y, int(chunk[local_y, local_x]))
+            if level:
+                levels[local_y, local_x] = level
+                refill.append((x, y))
+        self.spread(refill)
+        self.flush()
+
+    def on_block_changed(self, x0, y0, x1, y1):
+        self.relight((x, y) for y in range(y0, y1) for x in range(x0, x1))
+
+    def flush(self):
+        for chunk_x, chunk_y in self.changed:
+            for listener in self.listeners:
+                listener(chunk_x, chunk_y)
+        self.changed.clear()
@@ -0,0 +1,329 @@
+"""Поиск пути для мобов Pixel Miner: иерархический A* по порталам между чанками в фоновом потоке"""
+import heapq
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+
+from terrain import CHUNK_SIZE, SOLID
+
+FRAME_BUDGET = 0.002  # секунд поиска на кадр
+SLICE = 64  # раскрытий узлов между проверками бюджета
+MAX_EXPANSIONS = 20000  # дальше путь считается ненайденным
+MAX_GRAPHS = 1024  # сколько графов чанков держать
+MAX_PATHS = 512  # сколько готовых путей держать
+WIDE_PORTAL = 6  # длиннее — два портала по краям прохода вместо одного посередине
+MAX_RETRIES = 3  # сколько раз заново искать путь, если мир менялся во время поиска
+
+# Мобы ходят по четырём направлениям сквозь всё, что не SOLID (воздух, вода)
+NEIGHBOURS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+def bfs(passable, start):
+    # Обход в ширину внутри чанка от клетки start = (x, y) в координатах чанка:
+    # {клетка: (шагов от start, предыдущая клетка)}
+    tree = {start: (0, None)}
+    frontier = deque([start])
+    while frontier:
+        x, y = frontier.popleft()
+        steps = tree[(x, y)][0] + 1
+        for dx, dy in NEIGHBOURS:
+            nx, ny = x + dx, y + dy
+            if (0 <= nx < CHUNK_SIZE and 0 <= ny < CHUNK_SIZE and
+                    passable[ny][nx] and (nx, ny) not in tree):
+                tree[(nx, ny)] = (steps, (x, y))
+                frontier.append((nx, ny))
+    return tree
+
+
+def trace(tree, cell):
+    # Клетки от cell до корня дерева обхода
+    cells = []
+    while cell is not None:
+        cells.append(cell)
+        cell = tree[cell][1]
+    return cells
+
+
+def portal_cells(open_cells):
+    # Номера клеток-порталов на границе: по одной на проход (по две на широкий)
+    portals = []
+    start = None
+    for index, is_open in enumerate(open_cells + [False]):
+        if is_open and start is None:
+            start = index
+        elif not is_open and start is not None:
+            if index - start > WIDE_PORTAL:
+                portals += (start, index - 1)
+            else:
+                portals.append((start + index - 1) // 2)
+            start = None
+    return portals
+
+
+class ChunkGraph:
+    # Порталы чанка — проходимые клетки у границы с проходимым соседом по ту сторону —
+    # и кратчайшие пути между ними внутри чанка. Длинный маршрут ищется по порталам,
+    # а не по клеткам, и раскрывается в клетки только на найденном пути
+    def __init__(self, world, chunk_x, chunk_y, chunk):
+        self.passable = (~SOLID[chunk]).tolist()
+        self.base_x, self.base_y = chunk_x * CHUNK_SIZE, chunk_y * CHUNK_SIZE
+        last = CHUNK_SIZE - 1
+        self.exits = {}  # портал (x, y в чанке) -> клетки мира по ту сторону границы
+        self.missing = []  # соседи, которых не было в памяти: с их стороны порталов нет
+        for dx, dy in NEIGHBOURS:
+            neighbour = world.chunks.get((chunk_x + dx, chunk_y + dy))
+            if neighbour is None:
+                self.missing.append((chunk_x + dx, chunk_y + dy))
+                continue
+            other = ~SOLID[neighbour]
+            if dx:
+                here, there = (last, 0) if dx > 0 else (0, last)
+                open_cells = [self.passable[i][here] and bool(other[i, there]) for i in range(CHUNK_SIZE)]
+                cells = [(here, i) for i in portal_cells(open_cells)]
+            else:
+                here, there = (last, 0) if dy > 0 else (0, last)
+                open_cells = [self.passable[here][i] and bool(other[there, i]) for i in range(CHUNK_SIZE)]
+                cells = [(i, here) for i in portal_cells(open_cells)]
+            for x, y in cells:
+                self.exits.setdefault((x, y), []).append((self.base_x + x + dx, self.base_y + y + dy))
+        self.trees = {cell: bfs(self.passable, cell) for cell in self.exits}
+
+    def local(self, world_x, world_y):
+        return world_x - self.base_x, world_y - self.base_y
+
+    def world(self, cell):
+        return self.base_x + cell[0], self.base_y + cell[1]
+
+
+class PathRequest:
+    # Заявка на путь; path заполняется в фоновом потоке, затем done становится True.
+    # path — список клеток (x, y) от start до goal или None, если пути нет
+    def __init__(self, start, goal, frame):
+        self.start = start
+        self.goal = goal
+        self.frame = frame  # кадр подачи заявки
+        self.path = None
+        self.search_time = 0.0
+        self.retries = 0
+        self.done = False
+        self.frames = 0  # сколько кадров заявка ждала ответа
+
+
+class PathService:
+    # Поиск путей в фоновом потоке. Каждый кадр tick() выдаёт потоку FRAME_BUDGET
+    # секунд: поиск идёт кусками по SLICE раскрытий и, исчерпав бюджет, ждёт
+    # следующего кадра, поэтому десятки мобов не отнимают у кадра больше бюджета.
+    # Готовые пути кэшируются; set_block в чанке сбрасывает пути через него
+    def __init__(self, world, budget=FRAME_BUDGET):
+        self.world = world
+        self.budget = budget
+        self.requests = queue.SimpleQueue()
+        self.current = None  # (заявка, поиск-генератор, версия мира на старте)
+        self.graphs = OrderedDict()  # (chunk_x, chunk_y) -> ChunkGraph, только в фоновом потоке
+        self.dirty = deque()  # чанки, чьи графы устарели
+        # Кэш путей и отметки изменений общие для потоков
+        self.lock = threading.Lock()
+        self.paths = OrderedDict()  # (start, goal) -> путь
+        self.crossing = {}  # чанк -> ключи путей кэша, проходящих через него
+        self.version = 0
+        self.changed_at = {}  # чанк -> версия его последнего изменения
+        self.frame = 0
+        self.closed = False
+        self.go = threading.Event()
+        self.worker = threading.Thread(target=self.run, daemon=True)
+        self.worker.start()
+        world.listeners.append(self.on_block_changed)
+
+    def find(self, start, goal):
+        request = PathRequest(start, goal, self.frame)
+        with self.lock:
+            path = self.paths.get((start, goal))
+            if path is not None:
+                self.paths.move_to_end((start, goal))
+        if path is not None:
+            request.path = path
+            request.done = True
+        else:
+            self.requests.put(request)
+        return request
+
+    def tick(self):
+        # Раз в кадр: разрешает фоновому потоку искать ещё FRAME_BUDGET секунд
+        self.frame += 1
+        self.go.set()
+
+    def shutdown(self):
+        self.closed = True
+        self.go.set()
+        self.worker.join()
+
+    def on_block_changed(self, x0, y0, x1, y1):
+        # Вызывается из основного потока. Граница чанка входит в графы обоих
+        # соседей, поэтому прямоугольник расширяется на клетку
+        keys = [(chunk_x, chunk_y)
+                for chunk_y in range((y0 - 1) // CHUNK_SIZE, y1 // CHUNK_SIZE + 1)
+                for chunk_x in range((x0 - 1) // CHUNK_SIZE, x1 // CHUNK_SIZE + 1)]
+        with self.lock:
+            self.version += 1
+            for key in keys:
+                self.changed_at[key] = self.version
+                for cached in self.crossing.pop(key, ()):
+                    self.paths.pop(cached, None)
+        self.dirty.extend(keys)
+
+    def run(self):
+        while True:
+            self.go.wait()
+            self.go.clear()
+            if self.closed:
+                return
+            deadline = time.perf_counter() + self.budget
+            while time.perf_counter() < deadline:
+                while self.dirty:
+                    self.graphs.pop(self.dirty.popleft(), None)
+                if self.current is None:
+                    try:
+                        request = self.requests.get_nowait()
+                    except queue.Empty:
+                        break
+                    with self.lock:
+                        version = self.version
+                    self.current = (request, self.search(request.start, request.goal), version)
+                request, search, version = self.current
+                start = time.perf_counter()
+                try:
+                    next(search)
+                except StopIteration as result:
+                    self.current = None
+                    self.finish(request, result.value, version)
+                request.search_time += time.perf_counter() - start
+
+    def finish(self, request, path, version):
+        chunks = set()
+        if path is not None:
+            chunks = {(x // CHUNK_SIZE, y // CHUNK_SIZE) for x, y in path}
+        with self.lock:
+            if path is None:
+                stale = self.version > version
+            else:
+                stale = any(self.changed_at.get(key, 0) > version for key in chunks)
+            if stale and request.retries < MAX_RETRIES:
+                # Мир изменился, пока путь искали: ищем заново
+                request.retries += 1
+                self.requests.put(request)
+                return
+            if path is not None:
+                key = (request.start, request.goal)
+                self.paths[key] = path
+                for chunk in chunks:
+                    self.crossing.setdefault(chunk, set()).add(key)
+                while len(self.paths) > MAX_PATHS:
+                    self.paths.popitem(last=False)
+        request.path = path
+        request.frames = self.frame - request.frame
+        request.done = True
+
+    def graph(self, chunk_x, chunk_y):
+        # Граф загруженного чанка; None — чанка нет в памяти, туда пути нет.
+        # Поиск не генерирует и не грузит чанки
+        graph = self.graphs.get((chunk_x, chunk_y))
+        if graph is not None and any(key in self.world.chunks for key in graph.missing):
+            # Сосед загрузился после постройки графа: без его порталов путь через
+            # эту границу не найти, а загрузка чанка set_block не вызывает
+            graph = None
+        if graph is None:
+            # Основной поток может выгрузить чанк в любой момент: берём его один раз
+            chunk = self.world.chunks.get((chunk_x, chunk_y))
+            if chunk is None:
+                return None
+            graph = self.graphs[(chunk_x, chunk_y)] = ChunkGraph(self.world, chunk_x, chunk_y, chunk)
+            while len(self.graphs) > MAX_GRAPHS:
+                self.graphs.popitem(last=False)
+        else:
+            self.graphs.move_to_end((chunk_x, chunk_y))
+        return graph
+
+    def search(self, start, goal):
+        # A* по порталам: генератор, уступающий поток каждые SLICE раскрытий;
+        # результат — путь по клеткам (через StopIteration.value)
+        start_key = (start[0] // CHUNK_SIZE, start[1] // CHUNK_SIZE)
+        goal_key = (goal[0] // CHUNK_SIZE, goal[1] // CHUNK_SIZE)
+        start_graph, goal_graph = self.graph(*start_key), self.graph(*goal_key)
+        if start_graph is None or goal_graph is None:
+            return None
+        start_local, goal_local = start_graph.local(*start), goal_graph.local(*goal)
+        if not (start_graph.passable[start_local[1]][start_local[0]] and
+                goal_graph.passable[goal_local[1]][goal_local[0]]):
+            return None
+        if start == goal:
+            return [start]
+        # Пути от старта и до цели внутри их чанков
+        start_tree = bfs(start_graph.passable, start_local)
+        goal_tree = bfs(goal_graph.passable, goal_local)
+
+        def heuristic(cell):
+            return abs(cell[0] - goal[0]) + abs(cell[1] - goal[1])
+
+        heap = [(heuristic(start), 0, start)]
+        cost = {start: 0}
+        came_from = {start: None}
+        expansions = 0
+        while heap:
+            _, steps, node = heapq.heappop(heap)
+            if node == goal:
+                break
+            if steps > cost[node]:
+                continue
+            expansions += 1
+            if expansions > MAX_EXPANSIONS:
+                return None
+            if expansions % SLICE == 0:
+                yield
+
+            key = (node[0] // CHUNK_SIZE, node[1] // CHUNK_SIZE)
+            graph = start_graph if key == start_key else self.graph(*key)
+            if graph is None:
+                continue
+            local = graph.local(*node)
+            tree = start_tree if node == start else graph.trees.get(local, {})
+            links = [(graph.world(portal), tree[portal][0]) for portal in graph.exits if portal in tree]
+            links += [(cell, 1) for cell in graph.exits.get(local, ())]
+            if key == goal_key and local in goal_tree:
+                links.append((goal, goal_tree[local][0]))
+            for neighbour, length in links:
+                new_cost = steps + length
+                if new_cost < cost.get(neighbour, new_cost + 1):
+                    cost[neighbour] = new_cost
+                    came_from[neighbour] = node
+                    heapq.heappush(heap, (new_cost + heuristic(neighbour), new_cost, neighbour))
+        else:
+            return None
+
+        # Маршрут по порталам раскрывается в клетки по сохранённым обходам чанков
+        route = []
+        node = goal
+        while node is not None:
+            route.append(node)
+            node = came_from[node]
+        route.reverse()
+        path = [start]
+        for a, b in zip(route, route[1:]):
+            key = (a[0] // CHUNK_SIZE, a[1] // CHUNK_SIZE)
+            if key != (b[0] // CHUNK_SIZE, b[1] // CHUNK_SIZE):
+                path.append(b)  # шаг через границу
+                continue
+            graph = self.graph(*key)
+            if graph is None:
+                return None  # чанк выгрузили во время поиска
+            if a == start:
+                cells = trace(start_tree, graph.local(*b))[::-1]
+            elif b == goal:
+                cells = trace(goal_tree, graph.local(*a))
+            else:
+                tree = graph.trees.get(graph.local(*a))
+                if tree is None or graph.local(*b) not in tree:
+                    return None  # граф перестроили во время поиска
+                cells = trace(tree, graph.local(*b))[::-1]
+            path += [graph.world(cell) for cell in cells[1:]]
+        return path
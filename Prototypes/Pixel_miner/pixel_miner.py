@@ -1,13 +1,36 @@
 import pygame
+import numpy as np
+import argparse
+import math
+import os
 import random
 import sys
-import math
+import time
+from collections import OrderedDict
+
+from terrain import (CHUNK_SIZE, SURFACE_LEVEL, EMPTY, DIRT, STONE, COAL, IRON, GOLD, DIAMOND,
+                     SAND, GRAVEL, WATER, SOLID, generate_chunk)
+from chunk_loader import ChunkLoader
+from region import RegionStore
+from ecs import Entities, EntityField, PLAYER, ITEM, ITEM_SIZE
+from savegame import AutoSaver, read_level, region_dir, reset_save
+from profiler import FrameProfiler, NullProfiler
+from text import TextRenderer
+from atlas import TileAtlas, noise_texture
+from lighting import MAX_LIGHT, LightMap
+from block_physics import BlockPhysics
+from pathfinding import PathService
 
 # === Константы ===
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 TILE_SIZE = 30
-CHUNK_SIZE = 16
+# Потолок памяти мира: сколько чанков держать загруженными (~256 байт данных на чанк)
+MAX_LOADED_CHUNKS = 4096
+# Каталог сохранения мира
+SAVE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'saves', 'world')
+# Нарисованные текстуры блоков: textures/<имя>.png; чего нет — генерируется
+TEXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'textures')
 
 # Цвета
 BLACK = (0, 0, 0)
@@ -22,15 +45,6 @@ EYE_WHITE = (255, 255, 255)
 EYE_BLACK = (0, 0, 0)
 HIGHLIGHT = (0, 255, 0)
 
-# Типы блоков
-EMPTY = 0
-DIRT = 1
-STONE = 2
-COAL = 3
-IRON = 4
-GOLD = 5
-DIAMOND = 6
-
 BLOCK_COLORS = {
     EMPTY: LIGHT_BLUE,  # небо
     DIRT: BROWN,
@@ -38,23 +52,45 @@ BLOCK_COLORS = {
     COAL: (50, 50, 50),
     IRON: (200, 200, 200),
     GOLD: YELLOW,
-    DIAMOND: DARK_BLUE
+    DIAMOND: DARK_BLUE,
+    SAND: (230, 205, 140),
+    GRAVEL: (120, 110, 105),
+    WATER: (40, 90, 200)
+}
+
+TEXTURE_NAMES = {
+    DIRT: 'dirt',
+    STONE: 'stone',
+    COAL: 'coal',
+    IRON: 'iron',
+    GOLD: 'gold',
+    DIAMOND: 'diamond',
+    SAND: 'sand',
+    GRAVEL: 'gravel',
+    WATER: 'water'
 }
+ORES = (COAL, IRON, GOLD, DIAMOND)  # рисуются вкраплениями в камне
 
 
 # === Игрок ===
 class Player:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y # теперь прямо на y=0
+    # Физика игрока считается вместе с остальными сущностями в Entities
+    y = EntityField()
+    vx = EntityField()
+    vy = EntityField()
+    on_ground = EntityField()
+
+    def __init__(self, x, y, entities=None):
+        self.entities = Entities() if entities is None else entities
         self.width = TILE_SIZE
         self.height = TILE_SIZE * 1
         self.color = RED
 
-        # Физика
-        self.vx = 0
-        self.vy = 0
-        self.on_ground = False
+        # Хитбокс в тайлах: чуть уже спрайта, чтобы пролезать в шахту шириной в тайл
+        self.box_offset = 0.1
+        self.box_width = 0.8
+        self.box_height = 1.0
+        self.id = self.entities.spawn(PLAYER, x + self.box_offset, y, self.box_width, self.box_height)
         self.facing_right = True
 
         # Инвентарь
@@ -63,7 +99,16 @@ class Player:
         # Направление добычи
         self.mine_dir = (1, 0)
 
-    def move(self, world, keys):
+    @property
+    def x(self):
+        # Левый край спрайта, хитбокс сдвинут от него на box_offset
+        return self.entities.x[self.id].item() - self.box_offset
+
+    @x.setter
+    def x(self, value):
+        self.entities.x[self.id] = value + self.box_offset
+
+    def control(self, keys):
         self.vx = 0
         if keys[pygame.K_a] or keys[pygame.K_LEFT]:
             self.vx = -0.1
@@ -83,31 +128,11 @@ class Player:
             self.vy = -0.3
             self.on_ground = False
 
-        # Гравитация
-        self.vy += 0.01
-        if self.vy > 0.3:
-            self.vy = 0.3
-
-        # Движение по X
-        self.x += self.vx
-        if self.check_collision(world):
-            self.x -= self.vx
-
-        # Движение по Y
-        self.y += self.vy
-        if self.check_collision(world):
-            self.y -= self.vy
-            self.vy = 0
-            self.on_ground = True
-
-    def check_collision(self, world):
-        px, py = int(self.x), int(self.y)
-        for dx in [0, 0.8]:
-            for dy in [1, 1.5]:
-                block = world.get_block(int(px + dx), int(py + dy))
-                if block != EMPTY:
-                    return True
-        return False
+    def pick_up_items(self):
+        for index in self.entities.touching(self.id, ITEM):
+            block_type = int(self.entities.block[index])
+            self.inventory[block_type] = self.inventory.get(block_type, 0) + 1
+            self.entities.despawn(index)
 
     def draw(self, screen, camera_x, camera_y):
         screen_x = self.x * TILE_SIZE - camera_x
@@ -143,62 +168,304 @@ class Player:
 
 # === Мир ===
 class World:
-    def __init__(self):
-        self.chunks = {}
-
-    def get_block(self, world_x, world_y):
-        chunk_x = world_x // CHUNK_SIZE
-        chunk_y = world_y // CHUNK_SIZE
-        local_x = world_x % CHUNK_SIZE
-        local_y = world_y % CHUNK_SIZE
-
+    def __init__(self, seed=None, max_chunks=MAX_LOADED_CHUNKS, region_dir=None):
+        # Один и тот же сид всегда даёт один и тот же мир
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        # Чанк — массив uint8 CHUNK_SIZE x CHUNK_SIZE, индексируется [y, x].
+        # Порядок словаря — давность использования: в начале кандидаты на выгрузку
+        self.chunks = OrderedDict()
+        self.max_chunks = max_chunks
+        # Выгруженные изменённые чанки уходят в региональные файлы,
+        # нетронутые просто генерируются заново по сиду
+        self.regions = RegionStore(region_dir)
+        self.unsaved = set()  # чанки, изменённые после последней записи на диск
+        # Карты света чанков (см. lighting.py); выгружаются вместе с чанками
+        self.light = {}
+        # Подписчики на изменение блоков: функция(x0, y0, x1, y1),
+        # прямоугольник изменённых тайлов в мировых координатах (x1, y1 не включаются)
+        self.listeners = []
+        # Подписчики на появление чанка в памяти (сгенерирован или прочитан с диска):
+        # функция(chunk_x, chunk_y)
+        self.chunk_listeners = []
+
+    def peek_chunk(self, chunk_x, chunk_y):
+        # Чанк из памяти или с диска; None — если его ещё нужно сгенерировать
         chunk = self.chunks.get((chunk_x, chunk_y))
+        if chunk is not None:
+            self.chunks.move_to_end((chunk_x, chunk_y))
+            return chunk
+        chunk = self.regions.load(chunk_x, chunk_y)
+        if chunk is not None:
+            self.add_chunk(chunk_x, chunk_y, chunk)
+        return chunk
+
+    def get_chunk(self, chunk_x, chunk_y):
+        chunk = self.peek_chunk(chunk_x, chunk_y)
         if chunk is None:
             chunk = self.generate_chunk(chunk_x, chunk_y)
-            self.chunks[(chunk_x, chunk_y)] = chunk
-        return chunk[local_y][local_x]
+            self.add_chunk(chunk_x, chunk_y, chunk)
+        return chunk
+
+    def add_chunk(self, chunk_x, chunk_y, chunk):
+        self.chunks[(chunk_x, chunk_y)] = chunk
+        while len(self.chunks) > self.max_chunks:
+            self.evict_chunk()
+        for listener in self.chunk_listeners:
+            listener(chunk_x, chunk_y)
+
+    def evict_chunk(self):
+        key, chunk = self.chunks.popitem(last=False)
+        self.light.pop(key, None)
+        if key in self.unsaved:
+            self.regions.save(key[0], key[1], chunk)
+            self.unsaved.discard(key)
+
+    def save_dirty(self):
+        # Отдаёт на запись изменённые чанки, не выгружая их из памяти
+        for chunk_x, chunk_y in self.unsaved:
+            self.regions.save(chunk_x, chunk_y, self.chunks[(chunk_x, chunk_y)])
+        self.unsaved.clear()
+
+    def close(self):
+        self.regions.close()
 
-    def set_block(self, world_x, world_y, block_type):
-        chunk_x = world_x // CHUNK_SIZE
-        chunk_y = world_y // CHUNK_SIZE
-        local_x = world_x % CHUNK_SIZE
-        local_y = world_y % CHUNK_SIZE
+    def get_block(self, world_x, world_y):
+        chunk = self.get_chunk(world_x // CHUNK_SIZE, world_y // CHUNK_SIZE)
+        return int(chunk[world_y % CHUNK_SIZE, world_x % CHUNK_SIZE])
+
+    def get_blocks(self, xs, ys):
+        # Блоки в точках (xs[i], ys[i]) одним вызовом; каждый чанк берётся один раз
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        blocks = np.empty(xs.shape, dtype=np.uint8)
+        if not xs.size:
+            return blocks
+        chunk_xs = xs // CHUNK_SIZE
+        chunk_ys = ys // CHUNK_SIZE
+        # Группируем точки по чанкам: сортировка по общему ключу чанка
+        keys = (chunk_ys << 32) + (chunk_xs & 0xffffffff)
+        order = np.argsort(keys, kind='stable')
+        bounds = np.flatnonzero(np.diff(keys[order])) + 1
+        for group in np.split(order, bounds):
+            chunk = self.get_chunk(int(chunk_xs[group[0]]), int(chunk_ys[group[0]]))
+            blocks[group] = chunk[ys[group] % CHUNK_SIZE, xs[group] % CHUNK_SIZE]
+        return blocks
 
-        if (chunk_x, chunk_y) in self.chunks:
-            self.chunks[(chunk_x, chunk_y)][local_y][local_x] = block_type
+    def set_block(self, world_x, world_y, block_type):
+        key = (world_x // CHUNK_SIZE, world_y // CHUNK_SIZE)
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            chunk[world_y % CHUNK_SIZE, world_x % CHUNK_SIZE] = block_type
+            self.unsaved.add(key)
+            self.notify(world_x, world_y, world_x + 1, world_y + 1)
+
+    def notify(self, x0, y0, x1, y1):
+        for listener in self.listeners:
+            listener(x0, y0, x1, y1)
+
+    def iter_region(self, x0, y0, x1, y1):
+        # Разбивает прямоугольник [x0, x1) x [y0, y1) на куски по чанкам:
+        # (chunk_x, chunk_y, срез внутри чанка, срез внутри прямоугольника)
+        for chunk_y in range(y0 // CHUNK_SIZE, (y1 - 1) // CHUNK_SIZE + 1):
+            top = max(y0, chunk_y * CHUNK_SIZE)
+            bottom = min(y1, (chunk_y + 1) * CHUNK_SIZE)
+            for chunk_x in range(x0 // CHUNK_SIZE, (x1 - 1) // CHUNK_SIZE + 1):
+                left = max(x0, chunk_x * CHUNK_SIZE)
+                right = min(x1, (chunk_x + 1) * CHUNK_SIZE)
+                chunk_part = (slice(top - chunk_y * CHUNK_SIZE, bottom - chunk_y * CHUNK_SIZE),
+                              slice(left - chunk_x * CHUNK_SIZE, right - chunk_x * CHUNK_SIZE))
+                region_part = (slice(top - y0, bottom - y0), slice(left - x0, right - x0))
+                yield chunk_x, chunk_y, chunk_part, region_part
+
+    def get_region(self, x0, y0, x1, y1):
+        # Копия блоков прямоугольника [x0, x1) x [y0, y1), массив [y, x]
+        region = np.empty((max(0, y1 - y0), max(0, x1 - x0)), dtype=np.uint8)
+        if region.size:
+            for chunk_x, chunk_y, chunk_part, region_part in self.iter_region(x0, y0, x1, y1):
+                region[region_part] = self.get_chunk(chunk_x, chunk_y)[chunk_part]
+        return region
+
+    def fill_region(self, x0, y0, x1, y1, blocks):
+        # blocks — один тип блока или массив формы (y1 - y0, x1 - x0).
+        # В отличие от set_block, недостающие чанки сначала генерируются.
+        if x1 <= x0 or y1 <= y0:
+            return
+        blocks = np.asarray(blocks, dtype=np.uint8)
+        for chunk_x, chunk_y, chunk_part, region_part in self.iter_region(x0, y0, x1, y1):
+            chunk = self.get_chunk(chunk_x, chunk_y)
+            chunk[chunk_part] = blocks if blocks.ndim == 0 else blocks[region_part]
+            self.unsaved.add((chunk_x, chunk_y))
+        self.notify(x0, y0, x1, y1)
 
     def generate_chunk(self, chunk_x, chunk_y):
-        chunk_data = [[EMPTY for _ in range(CHUNK_SIZE)] for _ in range(CHUNK_SIZE)]
-        surface_level = 2
-
-        for local_y in range(CHUNK_SIZE):
-            world_y = chunk_y * CHUNK_SIZE + local_y
-            for local_x in range(CHUNK_SIZE):
-                if world_y < surface_level:
-                    continue  # воздух
-                elif world_y == surface_level:
-                    chunk_data[local_y][local_x] = DIRT
+        return generate_chunk(self.seed, chunk_x, chunk_y)
+
+
+# === Кэш отрисовки чанков ===
+CHUNK_PIXELS = CHUNK_SIZE * TILE_SIZE
+TILE_BORDER = (70, 70, 70)
+# Яркость тайла по уровню света (множитель цвета из 255): полная тьма оставляет еле видные контуры
+LIGHT_SHADE = (255 - (MAX_LIGHT - np.arange(MAX_LIGHT + 1)) * 16).astype(np.uint8)
+
+
+def viewport(camera_x, camera_y):
+    # Тайлы, хотя бы частично видимые на экране: [x0, x1) x [y0, y1).
+    # Камера округляется вниз до пикселя — все чанки сдвигаются на одно и то же целое
+    left, top = math.floor(camera_x), math.floor(camera_y)
+    return (left // TILE_SIZE, top // TILE_SIZE,
+            -(-(left + SCREEN_WIDTH) // TILE_SIZE), -(-(top + SCREEN_HEIGHT) // TILE_SIZE))
+
+
+def visible_chunks(world, camera_x, camera_y):
+    # Видимые части чанков: (chunk_x, chunk_y, область в картинке чанка, куда её выводить)
+    x0, y0, x1, y1 = viewport(camera_x, camera_y)
+    left, top = math.floor(camera_x), math.floor(camera_y)
+    for chunk_x, chunk_y, (rows, cols), _ in world.iter_region(x0, y0, x1, y1):
+        area = pygame.Rect(cols.start * TILE_SIZE, rows.start * TILE_SIZE,
+                           (cols.stop - cols.start) * TILE_SIZE, (rows.stop - rows.start) * TILE_SIZE)
+        yield chunk_x, chunk_y, area, (chunk_x * CHUNK_PIXELS + area.x - left,
+                                       chunk_y * CHUNK_PIXELS + area.y - top)
+
+
+def make_tile_atlas():
+    # Вызывается после создания окна: атлас сразу переводится в формат экрана
+    atlas = TileAtlas(TILE_SIZE)
+    for block_type, name in TEXTURE_NAMES.items():
+        if atlas.load(block_type, os.path.join(TEXTURE_DIR, name + '.png')):
+            continue
+        if block_type in ORES:
+            image = noise_texture(TILE_SIZE, BLOCK_COLORS[STONE], block_type,
+                                  BLOCK_COLORS[block_type], TILE_BORDER)
+        else:
+            # У воды нет рамки: соседние клетки сливаются в одну гладь
+            border = TILE_BORDER if SOLID[block_type] else None
+            image = noise_texture(TILE_SIZE, BLOCK_COLORS[block_type], block_type, border=border)
+        atlas.add(block_type, image)
+    return atlas.convert()
+
+
+class ChunkRenderer:
+    def __init__(self, world, loader=None, light=None):
+        self.world = world
+        # Если задан загрузчик, недостающие чанки генерируются в фоне
+        self.loader = loader
+        self.surfaces = {}  # (chunk_x, chunk_y) -> готовая картинка чанка
+        self.placeholders = {}
+        # Если задано освещение, поверх чанков рисуется их тень
+        self.light = light
+        self.overlays = {}  # (chunk_x, chunk_y) -> тень чанка, None — чанк освещён целиком
+        if light is not None:
+            light.listeners.append(self.on_light_changed)
+        # Текстуры блоков: чанк рисуется одним Surface.blits, а не двумя draw.rect на тайл
+        self.atlas = make_tile_atlas()
+        world.listeners.append(self.on_block_changed)
+
+    def on_block_changed(self, x0, y0, x1, y1):
+        if x1 - x0 == 1 and y1 - y0 == 1:
+            # Перерисовываем только изменившийся тайл в уже готовой картинке
+            surface = self.surfaces.get((x0 // CHUNK_SIZE, y0 // CHUNK_SIZE))
+            if surface is not None:
+                block_type = self.world.get_block(x0, y0)
+                self.draw_tile(surface, x0 % CHUNK_SIZE, y0 % CHUNK_SIZE, block_type)
+            return
+        # Крупное изменение — задетые чанки отрисуются заново целиком
+        for chunk_x, chunk_y, _, _ in self.world.iter_region(x0, y0, x1, y1):
+            self.surfaces.pop((chunk_x, chunk_y), None)
+
+    def on_light_changed(self, chunk_x, chunk_y):
+        self.overlays.pop((chunk_x, chunk_y), None)
+
+    def draw_tile(self, surface, local_x, local_y, block_type):
+        position = (local_x * TILE_SIZE, local_y * TILE_SIZE)
+        if block_type == EMPTY:
+            surface.fill(BLOCK_COLORS[EMPTY], (position, (TILE_SIZE, TILE_SIZE)))
+        else:
+            self.atlas.blit(surface, block_type, position)
+
+    def render_chunk(self, chunk_x, chunk_y):
+        chunk = self.world.get_chunk(chunk_x, chunk_y)
+        surface = pygame.Surface((CHUNK_PIXELS, CHUNK_PIXELS)).convert()
+        surface.fill(BLOCK_COLORS[EMPTY])
+        # Небо уже залито, остальные тайлы — одной пачкой из атласа
+        local_ys, local_xs = np.nonzero(chunk)
+        self.atlas.blits(surface, chunk[local_ys, local_xs].tolist(),
+                         (local_xs * TILE_SIZE).tolist(), (local_ys * TILE_SIZE).tolist())
+        return surface
+
+    def placeholder(self, chunk_y):
+        # Заглушка на время фоновой генерации: небо или сплошной камень
+        underground = (chunk_y + 1) * CHUNK_SIZE > SURFACE_LEVEL
+        surface = self.placeholders.get(underground)
+        if surface is None:
+            surface = pygame.Surface((CHUNK_PIXELS, CHUNK_PIXELS)).convert()
+            surface.fill(BLOCK_COLORS[EMPTY])
+            if underground:
+                local_ys, local_xs = np.indices((CHUNK_SIZE, CHUNK_SIZE)).reshape(2, -1) * TILE_SIZE
+                self.atlas.blits(surface, [STONE] * local_xs.size, local_xs.tolist(), local_ys.tolist())
+            self.placeholders[underground] = surface
+        return surface
+
+    def draw(self, screen, camera_x, camera_y):
+        # Обходим только видимые тайлы, разбитые по чанкам: на каждый чанк —
+        # одна выборка картинки и один blit его видимой части
+        for chunk_x, chunk_y, area, position in visible_chunks(self.world, camera_x, camera_y):
+            surface = self.surfaces.get((chunk_x, chunk_y))
+            if surface is None:
+                if self.loader is not None and self.world.peek_chunk(chunk_x, chunk_y) is None:
+                    # Чанк ещё не готов — кадр его не ждёт
+                    self.loader.request([(chunk_x, chunk_y)])
+                    surface = self.placeholder(chunk_y)
                 else:
-                    block = STONE
-                    ore_chance = random.random()
-                    if ore_chance < 0.02: block = COAL
-                    elif ore_chance < 0.035: block = IRON
-                    elif ore_chance < 0.042: block = GOLD
-                    elif ore_chance < 0.045: block = DIAMOND
-                    chunk_data[local_y][local_x] = block
-
-        # === добавляем большие пещеры ===
-        if random.random() < 0.2:  # шанс пещеры в чанке
-            cave_x = random.randint(4, CHUNK_SIZE - 4)
-            cave_y = random.randint(4, CHUNK_SIZE - 4)
-            cave_radius = random.randint(3, 6)
-            for y in range(CHUNK_SIZE):
-                for x in range(CHUNK_SIZE):
-                    dist = math.sqrt((x - cave_x) ** 2 + (y - cave_y) ** 2)
-                    if dist < cave_radius:
-                        chunk_data[y][x] = EMPTY
-
-        return chunk_data
+                    surface = self.render_chunk(chunk_x, chunk_y)
+                    self.surfaces[(chunk_x, chunk_y)] = surface
+            screen.blit(surface, position, area)
+
+        x0, y0, x1, y1 = viewport(camera_x, camera_y)
+        start_chunk_x, start_chunk_y = x0 // CHUNK_SIZE, y0 // CHUNK_SIZE
+        end_chunk_x, end_chunk_y = (x1 - 1) // CHUNK_SIZE, (y1 - 1) // CHUNK_SIZE
+
+        # Выгружаем картинки и тени чанков, ушедших за экран (с запасом в один чанк,
+        # чтобы не перерисовывать чанк, который мелькает на границе)
+        for cache in (self.surfaces, self.overlays):
+            for chunk_x, chunk_y in list(cache):
+                if not (start_chunk_x - 1 <= chunk_x <= end_chunk_x + 1 and
+                        start_chunk_y - 1 <= chunk_y <= end_chunk_y + 1):
+                    del cache[(chunk_x, chunk_y)]
+
+    def render_overlay(self, chunk_x, chunk_y):
+        # Тень чанка: тайл на пиксель с яркостью по уровню света, растянутая до чанка.
+        # Накладывается умножением цвета — это дешевле смешивания по альфе
+        levels = self.light.chunk_light(chunk_x, chunk_y)
+        if levels is None or levels.min() == MAX_LIGHT:
+            return None
+        shade = np.repeat(LIGHT_SHADE[levels.T][:, :, np.newaxis], 3, axis=2)
+        small = pygame.surfarray.make_surface(shade)
+        return pygame.transform.scale(small, (CHUNK_PIXELS, CHUNK_PIXELS)).convert()
+
+    def draw_light(self, screen, camera_x, camera_y):
+        # Тени поверх блоков и предметов; пересчитываются, только когда меняется свет
+        for chunk_x, chunk_y, area, position in visible_chunks(self.world, camera_x, camera_y):
+            if (chunk_x, chunk_y) in self.overlays:
+                overlay = self.overlays[(chunk_x, chunk_y)]
+            elif (chunk_x, chunk_y) in self.world.chunks:
+                overlay = self.overlays[(chunk_x, chunk_y)] = self.render_overlay(chunk_x, chunk_y)
+            else:
+                continue  # чанк ещё генерируется
+            if overlay is not None:
+                screen.blit(overlay, position, area, pygame.BLEND_RGB_MULT)
+
+
+# === Выпавшие предметы ===
+def draw_items(screen, entities, atlas, camera_x, camera_y):
+    # atlas — текстуры блоков размером с предмет, все видимые предметы рисуются одним blits
+    items = entities.living(ITEM)
+    size = atlas.size
+    screen_x = entities.x[items] * TILE_SIZE - camera_x
+    screen_y = entities.y[items] * TILE_SIZE - camera_y
+    visible = ((screen_x > -size) & (screen_x < SCREEN_WIDTH) &
+               (screen_y > -size) & (screen_y < SCREEN_HEIGHT))
+    atlas.blits(screen, entities.block[items[visible]].tolist(),
+                screen_x[visible].astype(int).tolist(), screen_y[visible].astype(int).tolist())
 
 
 # === Подсветка блока ===
@@ -213,7 +480,7 @@ def highlight_block(screen, player, camera_x, camera_y, world, mouse_pos=None):
         mx, my = get_mouse_block(mouse_pos, camera_x, camera_y)
         if abs(mx - int(player.x)) <= 2 and abs(my - int(player.y)) <= 2:
             block_type = world.get_block(mx, my)
-            if block_type != EMPTY:
+            if SOLID[block_type]:
                 screen_x = mx * TILE_SIZE - camera_x
                 screen_y = my * TILE_SIZE - camera_y
                 pygame.draw.rect(screen, HIGHLIGHT, (screen_x, screen_y, TILE_SIZE, TILE_SIZE), 3)
@@ -222,8 +489,7 @@ def highlight_block(screen, player, camera_x, camera_y, world, mouse_pos=None):
 
 
 # === Интерфейс ===
-def draw_ui(screen, player):
-    font = pygame.font.SysFont('Arial', 20)
+def draw_ui(screen, player, text):
     inventory_text = (
         f"Земля: {player.inventory[DIRT]} | "
         f"Уголь: {player.inventory[COAL]} | "
@@ -231,86 +497,283 @@ def draw_ui(screen, player):
         f"Золото: {player.inventory[GOLD]} | "
         f"Алмазы: {player.inventory[DIAMOND]}"
     )
-    text_surface = font.render(inventory_text, True, WHITE)
-    screen.blit(text_surface, (10, 10))
+    # Строка перерисовывается, только когда меняется инвентарь
+    screen.blit(text.render(inventory_text, 20, WHITE, 'Arial'), (10, 10))
 
 
 # === Главная функция ===
-def main():
+def main(profile=False, trace_path=None):
     pygame.init()
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-    pygame.display.set_caption("Pixel Miner - Fixed")
     clock = pygame.time.Clock()
 
-    world = World()
-    player = Player(SCREEN_WIDTH // 1 // TILE_SIZE, 0)
+    # Загрузка сохранения: чанки читаются с диска по мере надобности,
+    # поэтому время загрузки не зависит от размера мира
+    entities = Entities()
+    level = read_level(SAVE_DIR)
+    if level is None:
+        reset_save(SAVE_DIR)
+        world = World(region_dir=region_dir(SAVE_DIR))
+        player = Player(SCREEN_WIDTH // 1 // TILE_SIZE, 0, entities)
+    else:
+        seed, player_x, player_y, inventory = level
+        world = World(seed, region_dir=region_dir(SAVE_DIR))
+        player = Player(player_x, player_y, entities)
+        player.inventory.update(inventory)
+    autosaver = AutoSaver(world, player, SAVE_DIR)
+    pygame.display.set_caption(f"Pixel Miner - Fixed (сид {world.seed})")
+    loader = ChunkLoader(world, SCREEN_WIDTH / TILE_SIZE, SCREEN_HEIGHT / TILE_SIZE)
+    light = LightMap(world)
+    renderer = ChunkRenderer(world, loader, light)
+    physics = BlockPhysics(world)
+    item_atlas = renderer.atlas.scaled(int(ITEM_SIZE * TILE_SIZE)).convert()
+    text = TextRenderer()
+    # Замер фаз кадра включается ключами --profile / --trace
+    if profile or trace_path:
+        profiler = FrameProfiler(overlay=profile, trace_path=trace_path)
+    else:
+        profiler = NullProfiler()
 
     camera_x, camera_y = 0, 0
     running = True
     mouse_highlight = None
 
     while running:
-        keys = pygame.key.get_pressed()
-        mouse_pos = pygame.mouse.get_pos()
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            if event.type == pygame.MOUSEBUTTONDOWN and mouse_highlight:
-                mx, my = mouse_highlight
-                if event.button == 1:  # ЛКМ — сломать
-                    world.set_block(mx, my, EMPTY)
-                elif event.button == 3 and player.inventory[DIRT] > 0:  # ПКМ — поставить землю
-                    if world.get_block(mx, my) == EMPTY:
-                        world.set_block(mx, my, DIRT)
-                        player.inventory[DIRT] -= 1
-
-        # Движение игрока
-        player.move(world, keys)
+        profiler.begin_frame()
+
+        with profiler.phase('ввод'):
+            keys = pygame.key.get_pressed()
+            mouse_pos = pygame.mouse.get_pos()
+
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                if event.type == pygame.MOUSEBUTTONDOWN and mouse_highlight:
+                    mx, my = mouse_highlight
+                    if event.button == 1:  # ЛКМ — сломать, блок выпадает предметом
+                        block_type = world.get_block(mx, my)
+                        world.set_block(mx, my, EMPTY)
+                        entities.spawn_item(mx + 0.3, my + 0.3, block_type, random.uniform(-0.05, 0.05), -0.15)
+                    elif event.button == 3 and player.inventory[DIRT] > 0:  # ПКМ — поставить землю
+                        if world.get_block(mx, my) == EMPTY:
+                            world.set_block(mx, my, DIRT)
+                            player.inventory[DIRT] -= 1
+
+        with profiler.phase('обновление'):
+            # Управление игроком, физика всех сущностей разом, подбор предметов
+            player.control(keys)
+            entities.update(world)
+            player.pick_up_items()
+
+            # Песок, гравий и вода — только там, где что-то менялось
+            physics.update()
+
+            # Фоновая догрузка чанков вокруг игрока и по ходу движения
+            loader.update(player.x, player.y, player.vx, player.vy)
+
+            # Автосохранение изменённых чанков в фоне
+            autosaver.update()
 
         # Камера
         camera_x = player.x * TILE_SIZE - SCREEN_WIDTH // 2
         camera_y = player.y * TILE_SIZE - SCREEN_HEIGHT // 2
 
-        # Отрисовка
-        screen.fill(LIGHT_BLUE)
-        start_chunk_x = int(camera_x // TILE_SIZE) // CHUNK_SIZE
-        end_chunk_x = int((camera_x + SCREEN_WIDTH) // TILE_SIZE) // CHUNK_SIZE + 1
-        start_chunk_y = int(camera_y // TILE_SIZE) // CHUNK_SIZE
-        end_chunk_y = int((camera_y + SCREEN_HEIGHT) // TILE_SIZE) // CHUNK_SIZE + 1
-
-        for chunk_x in range(start_chunk_x, end_chunk_x):
-            for chunk_y in range(start_chunk_y, end_chunk_y):
-                for local_y in range(CHUNK_SIZE):
-                    for local_x in range(CHUNK_SIZE):
-                        world_x = chunk_x * CHUNK_SIZE + local_x
-                        world_y = chunk_y * CHUNK_SIZE + local_y
-                        screen_x = world_x * TILE_SIZE - camera_x
-                        screen_y = world_y * TILE_SIZE - camera_y
-
-                        if 0 <= screen_x < SCREEN_WIDTH and 0 <= screen_y < SCREEN_HEIGHT:
-                            block_type = world.get_block(world_x, world_y)
-                            if block_type != EMPTY:
-                                color = BLOCK_COLORS.get(block_type, BLACK)
-                                pygame.draw.rect(screen, color, (screen_x, screen_y, TILE_SIZE, TILE_SIZE))
-                                pygame.draw.rect(screen, (70, 70, 70),
-                                                 (screen_x, screen_y, TILE_SIZE, TILE_SIZE), 1)
-
-        # Игрок
-        player.draw(screen, camera_x, camera_y)
-
-        # Подсветка
-        mouse_highlight = highlight_block(screen, player, camera_x, camera_y, world, mouse_pos)
-
-        # UI
-        draw_ui(screen, player)
-
-        pygame.display.flip()
+        with profiler.phase('мир'):
+            screen.fill(LIGHT_BLUE)
+            renderer.draw(screen, camera_x, camera_y)
+
+            # Предметы и игрок
+            draw_items(screen, entities, item_atlas, camera_x, camera_y)
+
+        with profiler.phase('свет'):
+            renderer.draw_light(screen, camera_x, camera_y)
+
+        with profiler.phase('игрок'):
+            # Игрок поверх тени: шахтёра видно и в тёмной пещере
+            player.draw(screen, camera_x, camera_y)
+
+        with profiler.phase('интерфейс'):
+            # Подсветка
+            mouse_highlight = highlight_block(screen, player, camera_x, camera_y, world, mouse_pos)
+
+            draw_ui(screen, player, text)
+            profiler.draw(screen)
+
+        with profiler.phase('flip'):
+            pygame.display.flip()
+
+        profiler.end_frame()
         clock.tick(60)
 
+    profiler.dump_trace()
+    loader.shutdown()
+    autosaver.save()
+    world.close()
     pygame.quit()
     sys.exit()
 
 
+# === Симуляция без окна ===
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class ScriptedKeys:
+    # Подменяет pygame.key.get_pressed(): нажаты только перечисленные клавиши
+    def __init__(self, pressed=()):
+        self.pressed = set(pressed)
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+
+class TimedWorld(World):
+    # Мир, который считает время генерации чанков
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.generated = 0
+        self.generation_time = 0.0
+
+    def generate_chunk(self, chunk_x, chunk_y):
+        start = time.perf_counter()
+        chunk = super().generate_chunk(chunk_x, chunk_y)
+        self.generation_time += time.perf_counter() - start
+        self.generated += 1
+        return chunk
+
+
+class Bot:
+    # Простой сценарий ввода: бежит в стороны, прыгает и копает шахты вниз
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+        self.phase = 'right'
+
+    def keys(self, tick, world, player):
+        if tick % 120 == 0:
+            self.phase = self.random.choice(('right', 'right', 'left', 'dig'))
+        pressed = set()
+        if self.phase == 'right':
+            pressed.add(pygame.K_d)
+        elif self.phase == 'left':
+            pressed.add(pygame.K_a)
+        else:
+            pressed.add(pygame.K_s)
+            if tick % 15 == 0:  # как ЛКМ по блокам под хитбоксом
+                left = int(player.x + player.box_offset)
+                right = int(player.x + player.box_offset + player.box_width)
+                for world_x in range(left, right + 1):
+                    world.set_block(world_x, round(player.y) + 1, EMPTY)
+                    world.set_block(world_x, round(player.y) + 2, EMPTY)
+        if tick % 45 == 0:
+            pressed.add(pygame.K_SPACE)
+        return ScriptedKeys(pressed)
+
+
+def peak_memory_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux отдаёт килобайты, macOS — байты
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def run_headless(ticks, seed=None, max_chunks=MAX_LOADED_CHUNKS, min_tps=0, items=0, mobs=0):
+    world = TimedWorld(seed, max_chunks)
+    entities = Entities()
+    player = Player(SCREEN_WIDTH // TILE_SIZE, 0, entities)
+    bot = Bot(world.seed)
+    physics = BlockPhysics(world)
+    block_updates = peak_updates = 0
+    # Нагрузочный тест поиска пути: раз в секунду каждый моб ищет путь к игроку
+    # из случайной свободной клетки в загруженных чанках вокруг него
+    paths = PathService(world) if mobs else None
+    path_requests = []
+
+    # Нагрузочный тест физики: предметы падают с неба вокруг точки старта
+    scatter = np.random.default_rng(world.seed)
+    for x, y in zip(scatter.uniform(-100, 100, items), scatter.uniform(-30, 0, items)):
+        entities.spawn_item(player.x + x, y, STONE)
+
+    start = time.perf_counter()
+    for tick in range(ticks):
+        player.control(bot.keys(tick, world, player))
+        entities.update(world)
+        player.pick_up_items()
+        physics.update()
+        block_updates += physics.updates
+        peak_updates = max(peak_updates, physics.updates)
+        if paths is not None:
+            if tick % 60 == 0:  # раз в секунду при 60 кадрах
+                goal = (int(player.x + 0.5), round(player.y))
+                for _ in range(mobs):
+                    mob = (goal[0] + scatter.integers(-40, 41), goal[1] + scatter.integers(-20, 21))
+                    mob = (int(mob[0]), int(mob[1]))
+                    chunk = world.chunks.get((mob[0] // CHUNK_SIZE, mob[1] // CHUNK_SIZE))
+                    if chunk is not None and not SOLID[chunk[mob[1] % CHUNK_SIZE, mob[0] % CHUNK_SIZE]]:
+                        path_requests.append(paths.find(mob, goal))
+            paths.tick()
+    elapsed = time.perf_counter() - start
+    if paths is not None:
+        paths.shutdown()
+    world.close()
+
+    tps = ticks / elapsed if elapsed else float('inf')
+    print(f"Сид: {world.seed}, тиков: {ticks} за {elapsed:.3f} с — {tps:.0f} тиков/с")
+    per_chunk = world.generation_time / world.generated * 1e6 if world.generated else 0
+    print(f"Чанков сгенерировано: {world.generated}, генерация: "
+          f"{world.generation_time * 1000:.1f} мс ({per_chunk:.0f} мкс на чанк)")
+    print(f"Чанков в памяти: {len(world.chunks)}, игрок на ({player.x:.1f}, {player.y:.1f}), "
+          f"предметов: {len(entities.living(ITEM))}")
+    print(f"Обновлений блоков: {block_updates} (до {peak_updates} за тик), "
+          f"активных чанков в конце: {len(physics.awake)}")
+    if paths is not None:
+        answered = [request for request in path_requests if request.done]
+        found = sum(1 for request in answered if request.path is not None)
+        searched = sorted(request.search_time for request in answered)
+        waits = [request.frames for request in answered]
+        print(f"Путей запрошено: {len(path_requests)}, готово: {len(answered)}, найдено: {found}, "
+              f"из кэша: {sum(1 for request in answered if not request.search_time)}")
+        if answered:
+            p50, p99 = (searched[min(len(searched) - 1, int(p * len(searched)))] for p in (0.5, 0.99))
+            print(f"Поиск: p50 {p50 * 1000:.2f} мс, p99 {p99 * 1000:.2f} мс; ожидание: в среднем "
+                  f"{sum(waits) / len(waits):.1f}, до {max(waits)} кадров "
+                  f"при бюджете {paths.budget * 1000:.1f} мс на кадр")
+    peak = peak_memory_mb()
+    if peak is not None:
+        print(f"Пиковая память: {peak:.1f} МБ")
+
+    if tps < min_tps:
+        print(f"Скорость ниже порога {min_tps:.0f} тиков/с")
+        return 1
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Pixel Miner")
+    parser.add_argument('--profile', action='store_true',
+                        help="оверлей с перцентилями времени кадра")
+    parser.add_argument('--trace', metavar='FILE',
+                        help="записать трассу кадров для chrome://tracing при выходе")
+    parser.add_argument('--headless', action='store_true',
+                        help="симуляция без окна с замером скорости")
+    parser.add_argument('--ticks', type=int, default=10000, help="число тиков симуляции")
+    parser.add_argument('--seed', type=int, default=None, help="сид мира")
+    parser.add_argument('--max-chunks', type=int, default=MAX_LOADED_CHUNKS,
+                        help="сколько чанков держать в памяти")
+    parser.add_argument('--items', type=int, default=0,
+                        help="сколько выпавших предметов добавить для нагрузки на физику")
+    parser.add_argument('--mobs', type=int, default=0,
+                        help="сколько мобов ищут путь к игроку для нагрузки на поиск пути")
+    parser.add_argument('--min-tps', type=float, default=0,
+                        help="код выхода 1, если тиков в секунду меньше")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.headless:
+        sys.exit(run_headless(args.ticks, args.seed, args.max_chunks, args.min_tps,
+                              args.items, args.mobs))
+    main(args.profile, args.trace)
@@ -0,0 +1,111 @@
+"""Замер времени кадра по фазам: оверлей с перцентилями и трасса для chrome://tracing"""
+import json
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+import pygame
+
+WINDOW = 300  # кадров в скользящем окне
+OVERLAY_REFRESH = 0.25  # секунд между перерисовками оверлея
+TRACE_LIMIT = 200000  # событий в трассе, более старые отбрасываются
+
+
+class NullProfiler:
+    # Профилирование выключено: все вызовы ничего не делают
+    def begin_frame(self):
+        pass
+
+    def phase(self, name):
+        return nullcontext()
+
+    def end_frame(self):
+        pass
+
+    def draw(self, screen):
+        return None
+
+    def dump_trace(self):
+        pass
+
+
+class FrameProfiler:
+    def __init__(self, overlay=True, trace_path=None, window=WINDOW):
+        self.overlay = overlay
+        self.trace_path = trace_path
+        self.frames = deque(maxlen=window)
+        self.phases = {}  # имя фазы -> длительности за окно
+        self.events = deque(maxlen=TRACE_LIMIT)  # (имя, начало, конец)
+        self.origin = time.perf_counter()
+        self.frame_start = self.origin
+        self.font = None
+        self.surface = None
+        self.surface_time = 0.0
+
+    def begin_frame(self):
+        self.frame_start = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            times = self.phases.get(name)
+            if times is None:
+                times = self.phases[name] = deque(maxlen=self.frames.maxlen)
+            times.append(end - start)
+            if self.trace_path:
+                self.events.append((name, start, end))
+
+    def end_frame(self):
+        end = time.perf_counter()
+        self.frames.append(end - self.frame_start)
+        if self.trace_path:
+            self.events.append(('frame', self.frame_start, end))
+
+    def percentiles(self, points=(0.5, 0.95, 0.99)):
+        # Перцентили времени кадра в миллисекундах за скользящее окно
+        ordered = sorted(self.frames)
+        if not ordered:
+            return tuple(0.0 for _ in points)
+        return tuple(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000 for p in points)
+
+    def draw(self, screen, pos=(10, 40)):
+        # Возвращает область экрана под оверлеем (None, если он выключен)
+        if not self.overlay:
+            return None
+        # Текст оверлея обновляется несколько раз в секунду, а не каждый кадр
+        now = time.perf_counter()
+        if self.surface is None or now - self.surface_time >= OVERLAY_REFRESH:
+            self.surface = self.render_overlay()
+            self.surface_time = now
+        return screen.blit(self.surface, pos)
+
+    def render_overlay(self):
+        if self.font is None:
+            self.font = pygame.font.Font(None, 20)
+        p50, p95, p99 = self.percentiles()
+        lines = [f"кадр p50 {p50:.2f}  p95 {p95:.2f}  p99 {p99:.2f} мс"]
+        for name, times in self.phases.items():
+            lines.append(f"{name}: {sum(times) / len(times) * 1000:.2f} мс")
+        rendered = [self.font.render(line, True, (255, 255, 255)) for line in lines]
+        surface = pygame.Surface((max(r.get_width() for r in rendered) + 8,
+                                  sum(r.get_height() for r in rendered) + 8), pygame.SRCALPHA)
+        surface.fill((0, 0, 0, 160))
+        y = 4
+        for r in rendered:
+            surface.blit(r, (4, y))
+            y += r.get_height()
+        return surface
+
+    def dump_trace(self):
+        # Формат Trace Event: открывается в chrome://tracing или ui.perfetto.dev
+        if not self.trace_path:
+            return
+        events = [{'name': name, 'ph': 'X', 'pid': 1, 'tid': 1,
+                   'ts': (start - self.origin) * 1e6, 'dur': (end - start) * 1e6}
+                  for name, start, end in self.events]
+        with open(self.trace_path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
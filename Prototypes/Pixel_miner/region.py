@@ -0,0 +1,224 @@
+"""Региональные файлы Pixel Miner: выгруженные из памяти изменённые чанки"""
+import mmap
+import os
+import queue
+import shutil
+import struct
+import tempfile
+import threading
+import zlib
+
+import numpy as np
+
+from terrain import CHUNK_SIZE
+
+# Регион — группа REGION_SIZE x REGION_SIZE чанков в одном файле (как в Minecraft)
+REGION_SIZE = 32
+REGION_MAGIC = b'PMRG'
+REGION_VERSION = 2  # данные чанков сжаты zlib
+SECTOR = 256  # место под чанк выделяется кратно SECTOR байт, с запасом на рост
+
+# Заголовок файла, за ним таблица смещений: (offset, length) на каждый чанк региона.
+# offset == 0 — чанка в файле нет
+HEADER = struct.Struct('<4sHH')
+ENTRY = struct.Struct('<II')
+TABLE_OFFSET = HEADER.size
+DATA_OFFSET = TABLE_OFFSET + ENTRY.size * REGION_SIZE * REGION_SIZE
+
+
+class RegionFile:
+    def __init__(self, path):
+        self.path = path
+        self.view = None  # mmap только для чтения, создаётся по требованию
+        if os.path.exists(path):
+            self.file = open(path, 'r+b')
+            magic, version, size = HEADER.unpack(self.file.read(HEADER.size))
+            if magic != REGION_MAGIC or version != REGION_VERSION or size != REGION_SIZE:
+                raise ValueError(f"{path}: неизвестный формат региона")
+            table = self.file.read(DATA_OFFSET - TABLE_OFFSET)
+            self.table = [list(entry) for entry in ENTRY.iter_unpack(table)]
+            self.end = self.file.seek(0, os.SEEK_END)
+        else:
+            self.file = open(path, 'w+b')
+            self.table = [[0, 0] for _ in range(REGION_SIZE * REGION_SIZE)]
+            self.file.write(HEADER.pack(REGION_MAGIC, REGION_VERSION, REGION_SIZE))
+            self.file.write(b'\0' * (DATA_OFFSET - TABLE_OFFSET))
+            self.file.flush()
+            self.end = DATA_OFFSET
+        self.find_slots()
+
+    def find_slots(self):
+        # Размер места чанка хранится отдельно от длины данных: место — всё до начала
+        # следующего чанка (или конца файла), так дыры после уменьшившихся чанков
+        # снова идут в дело. Свободно только место перед первым чанком
+        self.sizes = [0] * len(self.table)
+        used = sorted((entry[0], index) for index, entry in enumerate(self.table) if entry[0])
+        ends = [offset for offset, _ in used[1:]] + [max(self.end, DATA_OFFSET)]
+        for (offset, index), end in zip(used, ends):
+            self.sizes[index] = end - offset
+        first = used[0][0] if used else self.end
+        self.free = [[DATA_OFFSET, first - DATA_OFFSET]] if first > DATA_OFFSET else []
+
+    def read(self, index):
+        offset, length = self.table[index]
+        if not offset:
+            return None
+        if self.view is None:
+            self.view = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self.view[offset:offset + length]
+
+    def write(self, index, payload):
+        # Копирование при записи: новые данные пишутся в свободное место, и только
+        # после этого таблица переключается на них. Если процесс убьют посреди записи,
+        # в файле останется старая целая копия чанка, а не обрывок потока zlib
+        offset, size = self.allocate(len(payload))
+        if self.view is not None and offset + len(payload) > len(self.view):
+            self.close_view()  # отображение старого размера файла не видит новых данных
+        self.file.seek(offset)
+        self.file.write(payload)
+        self.file.flush()
+        old_offset, old_size = self.table[index][0], self.sizes[index]
+        self.table[index] = [offset, len(payload)]
+        self.sizes[index] = size
+        self.file.seek(TABLE_OFFSET + index * ENTRY.size)
+        self.file.write(ENTRY.pack(offset, len(payload)))
+        self.file.flush()
+        if old_offset:
+            self.release(old_offset, old_size)
+
+    def allocate(self, length):
+        # (смещение, размер) места под length байт: первая подходящая дыра или конец файла
+        size = -(-length // SECTOR) * SECTOR
+        for hole in self.free:
+            if hole[1] >= length:
+                offset = hole[0]
+                size = min(size, hole[1])
+                hole[0] += size
+                hole[1] -= size
+                if not hole[1]:
+                    self.free.remove(hole)
+                return offset, size
+        offset = self.end
+        self.end += size
+        return offset, size
+
+    def release(self, offset, size):
+        # Место вернулось в свободные; соседние дыры сливаются
+        self.free.append([offset, size])
+        self.free.sort()
+        merged = [self.free[0]]
+        for hole in self.free[1:]:
+            if merged[-1][0] + merged[-1][1] == hole[0]:
+                merged[-1][1] += hole[1]
+            else:
+                merged.append(hole)
+        self.free = merged
+
+    def close_view(self):
+        if self.view is not None:
+            self.view.close()
+            self.view = None
+
+    def close(self):
+        self.close_view()
+        self.file.close()
+
+
+class RegionStore:
+    def __init__(self, directory=None):
+        # Без каталога файлы живут во временной папке до конца сессии
+        self.directory = directory
+        self.owns_directory = directory is None
+        self.regions = {}
+        self.missing = set()  # регионы, файлов которых на диске нет
+        # Все записи идут по порядку в одном фоновом потоке, чтобы не тормозить кадр.
+        # pending — ещё не записанные данные чанков, load() видит их сразу
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.jobs = queue.Queue()
+        self.writer = None
+
+    def region(self, chunk_x, chunk_y, create=False):
+        key = (chunk_x // REGION_SIZE, chunk_y // REGION_SIZE)
+        region = self.regions.get(key)
+        if region is None:
+            if not create and (self.directory is None or key in self.missing):
+                return None
+            if self.directory is None:
+                self.directory = tempfile.mkdtemp(prefix='pixel_miner_')
+            path = os.path.join(self.directory, 'r.%d.%d.dat' % key)
+            if not create and not os.path.exists(path):
+                self.missing.add(key)
+                return None
+            os.makedirs(self.directory, exist_ok=True)
+            region = RegionFile(path)
+            self.regions[key] = region
+            self.missing.discard(key)
+        return region
+
+    @staticmethod
+    def index(chunk_x, chunk_y):
+        return (chunk_y % REGION_SIZE) * REGION_SIZE + chunk_x % REGION_SIZE
+
+    def load(self, chunk_x, chunk_y):
+        with self.lock:
+            data = self.pending.get((chunk_x, chunk_y))
+            if data is None:
+                region = self.region(chunk_x, chunk_y)
+                payload = region.read(self.index(chunk_x, chunk_y)) if region else None
+                if payload is None:
+                    return None
+                data = zlib.decompress(payload)
+        return np.frombuffer(data, dtype=np.uint8).reshape(CHUNK_SIZE, CHUNK_SIZE).copy()
+
+    def save(self, chunk_x, chunk_y, chunk):
+        with self.lock:
+            self.pending[(chunk_x, chunk_y)] = chunk.tobytes()
+        self.submit(self.write_chunk, chunk_x, chunk_y)
+
+    def submit(self, job, *args):
+        if self.writer is None:
+            self.writer = threading.Thread(target=self.run_writer, daemon=True)
+            self.writer.start()
+        self.jobs.put((job, args))
+
+    def run_writer(self):
+        while True:
+            item = self.jobs.get()
+            try:
+                if item is None:
+                    return
+                job, args = item
+                job(*args)
+            except Exception as e:
+                print(f"Ошибка записи мира: {e}")
+            finally:
+                self.jobs.task_done()
+
+    def write_chunk(self, chunk_x, chunk_y):
+        with self.lock:
+            data = self.pending.get((chunk_x, chunk_y))
+        if data is None:
+            return  # уже записан заданием для более свежей версии
+        payload = zlib.compress(data)
+        with self.lock:
+            region = self.region(chunk_x, chunk_y, create=True)
+            region.write(self.index(chunk_x, chunk_y), payload)
+            if self.pending.get((chunk_x, chunk_y)) is data:
+                del self.pending[(chunk_x, chunk_y)]
+
+    def wait(self):
+        # Ждёт, пока все отданные на запись данные окажутся на диске
+        self.jobs.join()
+
+    def close(self):
+        if self.writer is not None:
+            self.jobs.put(None)
+            self.writer.join()
+            self.writer = None
+        for region in self.regions.values():
+            region.close()
+        self.regions.clear()
+        if self.owns_directory and self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory = None
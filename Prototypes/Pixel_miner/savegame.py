@@ -0,0 +1,79 @@
+"""Сохранение Pixel Miner: заголовок мира и игрока, чанки — в региональных файлах"""
+import os
+import shutil
+import struct
+import time
+
+LEVEL_FILE = 'level.dat'
+REGION_DIR = 'region'
+LEVEL_MAGIC = b'PMSV'
+LEVEL_VERSION = 1
+
+# magic, версия, сид, позиция игрока, число записей инвентаря; за ним записи (блок, количество)
+LEVEL_HEADER = struct.Struct('<4sHQddH')
+INVENTORY_ENTRY = struct.Struct('<BI')
+
+AUTOSAVE_INTERVAL = 30.0  # секунд
+
+
+def region_dir(directory):
+    return os.path.join(directory, REGION_DIR)
+
+
+def pack_level(seed, player):
+    data = LEVEL_HEADER.pack(LEVEL_MAGIC, LEVEL_VERSION, seed, player.x, player.y,
+                             len(player.inventory))
+    for block_type, count in player.inventory.items():
+        data += INVENTORY_ENTRY.pack(block_type, count)
+    return data
+
+
+def write_level(directory, data):
+    # Пишем во временный файл и подменяем, чтобы не оставить битый заголовок
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, LEVEL_FILE)
+    with open(path + '.tmp', 'wb') as f:
+        f.write(data)
+    os.replace(path + '.tmp', path)
+
+
+def read_level(directory):
+    # Возвращает (seed, x, y, inventory) или None, если сохранения нет
+    path = os.path.join(directory, LEVEL_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version, seed, x, y, count = LEVEL_HEADER.unpack_from(data)
+    if magic != LEVEL_MAGIC or version != LEVEL_VERSION:
+        raise ValueError(f"{path}: неизвестный формат сохранения")
+    inventory = {}
+    for i in range(count):
+        block_type, amount = INVENTORY_ENTRY.unpack_from(data, LEVEL_HEADER.size + i * INVENTORY_ENTRY.size)
+        inventory[block_type] = amount
+    return seed, x, y, inventory
+
+
+def reset_save(directory):
+    # Новый мир: старые региональные файлы принадлежат другому сиду
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+class AutoSaver:
+    def __init__(self, world, player, directory, interval=AUTOSAVE_INTERVAL):
+        self.world = world
+        self.player = player
+        self.directory = directory
+        self.interval = interval
+        self.last_save = time.monotonic()
+
+    def update(self):
+        if time.monotonic() - self.last_save >= self.interval:
+            self.save()
+
+    def save(self):
+        # В кадре — только снимок изменённых с прошлого раза чанков,
+        # сжатие и запись идут в фоновом потоке хранилища регионов
+        self.world.save_dirty()
+        self.world.regions.submit(write_level, self.directory, pack_level(self.world.seed, self.player))
+        self.last_save = time.monotonic()
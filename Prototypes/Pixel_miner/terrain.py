@@ -0,0 +1,70 @@
+"""Генерация мира Pixel Miner: типы блоков и детерминированные чанки по сиду"""
+import numpy as np
+
+CHUNK_SIZE = 16
+
+# Типы блоков
+EMPTY = 0
+DIRT = 1
+STONE = 2
+COAL = 3
+IRON = 4
+GOLD = 5
+DIAMOND = 6
+SAND = 7  # падает и осыпается по диагонали
+GRAVEL = 8  # падает отвесно
+WATER = 9  # течёт
+
+# Сквозь что нельзя пройти и что не пропускает свет: таблица по типу блока
+SOLID = np.ones(256, dtype=bool)
+SOLID[[EMPTY, WATER]] = False
+
+SURFACE_LEVEL = 2
+
+# Руда: бросок < порога даёт соответствующий блок, иначе камень
+ORE_THRESHOLDS = np.array([0.02, 0.035, 0.042, 0.045, 0.07])
+ORE_BLOCKS = np.array([COAL, IRON, GOLD, DIAMOND, GRAVEL, STONE], dtype=np.uint8)
+
+CAVE_CHANCE = 0.2
+WATER_CHANCE = 0.5  # доля пещер с водой на дне
+SAND_CHANCE = 0.3  # доля чанков с песком вместо земли на поверхности
+
+# Сетка координат внутри чанка, считается один раз
+_LOCAL_Y, _LOCAL_X = np.ogrid[0:CHUNK_SIZE, 0:CHUNK_SIZE]
+
+
+def chunk_rng(seed, chunk_x, chunk_y):
+    # Отдельный генератор на каждый чанк: результат не зависит
+    # от порядка, в котором игрок обходит мир
+    return np.random.default_rng([seed, chunk_x % 2 ** 32, chunk_y % 2 ** 32])
+
+
+def generate_chunk(seed, chunk_x, chunk_y):
+    rng = chunk_rng(seed, chunk_x, chunk_y)
+    world_y = chunk_y * CHUNK_SIZE + _LOCAL_Y
+
+    # Подземелье: камень с вкраплениями руды, над ним земля и воздух
+    ore_roll = rng.random((CHUNK_SIZE, CHUNK_SIZE))
+    chunk_data = ORE_BLOCKS[np.searchsorted(ORE_THRESHOLDS, ore_roll, side='right')]
+    chunk_data[np.broadcast_to(world_y == SURFACE_LEVEL, chunk_data.shape)] = DIRT
+    chunk_data[np.broadcast_to(world_y < SURFACE_LEVEL, chunk_data.shape)] = EMPTY
+
+    # === добавляем большие пещеры ===
+    if rng.random() < CAVE_CHANCE:
+        cave_x, cave_y = rng.integers(4, CHUNK_SIZE - 4, size=2, endpoint=True)
+        cave_radius = rng.integers(3, 6, endpoint=True)
+        cave = (_LOCAL_X - cave_x) ** 2 + (_LOCAL_Y - cave_y) ** 2 < cave_radius ** 2
+        chunk_data[cave] = EMPTY
+        if rng.random() < WATER_CHANCE:
+            # Вода только там, где пещера вырезана в земле, а не висит в небе
+            chunk_data[cave & (_LOCAL_Y > cave_y) & (world_y > SURFACE_LEVEL)] = WATER
+
+    if rng.random() < SAND_CHANCE:
+        chunk_data[chunk_data == DIRT] = SAND
+
+    return chunk_data
+
+
+def generate_chunks(seed, coords):
+    # Пакетная генерация: один вызов на пачку чанков для фоновых процессов
+    return [generate_chunk(seed, chunk_x, chunk_y) for chunk_x, chunk_y in coords]